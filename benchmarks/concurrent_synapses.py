@@ -0,0 +1,129 @@
+"""
+Concurrent synapse throughput of forward_arbitrage, settlements persisted with the sync or the async session.
+
+Prices come from a stub that answers after a short delay, like a warm ticker cache. Besides the throughput,
+the largest delay seen by a task ticking every millisecond shows how long the event loop was blocked.
+
+Usage:
+    python benchmarks/concurrent_synapses.py --synapses 2000 --miners 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import types
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+import template.validator.database as database
+from neurons.validator import Validator
+from template.protocol import ArbitrageData
+from template.utils.misc import KeyedLock
+from template.validator import crud
+from template.validator.db.models import Base
+from template.validator.ledger import MinerLedger
+from template.validator.schemas import SettlementCreate
+from template.validator.settlement import PendingSettlement
+
+
+class NullScheduler:
+    def schedule(self, settlement):
+        pass
+
+
+async def schedule_transaction_sync(
+    self, synapse, miner_hotkey, amount_for_buying, fees1, fees2, price1, price2
+):
+    # The sync path: the settlement is written with a blocking session on the event loop.
+    settlement = PendingSettlement(
+        miner_hotkey, synapse.pair, synapse.exchange1, synapse.exchange2,
+        price1, price2, fees1, fees2, amount_for_buying, time.time(),
+    )
+    with database.session_scope() as db:
+        settlement.id = crud.settlement.create(
+            db=db,
+            obj_in=SettlementCreate(
+                miner_hotkey=miner_hotkey,
+                pair=synapse.pair,
+                exchange_from=synapse.exchange1,
+                exchange_to=synapse.exchange2,
+                price_from=price1,
+                price_to=price2,
+                fees_from=fees1,
+                fees_to=fees2,
+                amount=amount_for_buying,
+                due_at=settlement.due_at,
+            ),
+        ).id
+    self.settlements.schedule(settlement)
+
+
+def make_validator(path, sync):
+    engine = database.create_db_engine(path)
+    Base.metadata.create_all(bind=engine)
+    database.SessionLocal = sessionmaker(bind=engine)
+    database.AsyncSessionLocal = async_sessionmaker(
+        database.create_async_db_engine(path), expire_on_commit=False
+    )
+
+    neuron = object.__new__(Validator)
+    neuron.config = types.SimpleNamespace(neuron=types.SimpleNamespace(settlement_delay=300))
+    neuron.ledger = MinerLedger(database.SessionLocal)
+    neuron.miner_locks = KeyedLock()
+    neuron.settlements = NullScheduler()
+
+    async def fetch_leg(exchange_id, symbol):
+        await asyncio.sleep(0.001)
+        return {"price": 100.0 if exchange_id == "binance" else 101.0, "fees": 0.001}
+
+    neuron.fetch_leg = fetch_leg
+    if sync:
+        neuron.schedule_transaction = types.MethodType(schedule_transaction_sync, neuron)
+    return neuron
+
+
+async def measure(neuron, synapses, miners):
+    lag = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - start - 0.001)
+
+    def synapse(i):
+        s = ArbitrageData(pair="BTC/USDT", exchange1="binance", exchange2="okx", amount=0.001)
+        s.dendrite.hotkey = f"hotkey{i % miners}"
+        return s
+
+    ticker = asyncio.ensure_future(heartbeat())
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[neuron.forward_arbitrage(synapse(i)) for i in range(synapses)])
+    elapsed = time.perf_counter() - start
+    done = True
+    await ticker
+
+    assert all(response.status_code == 200 for response in responses)
+    return synapses / elapsed, lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--synapses", type=int, default=2000)
+    parser.add_argument("--miners", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, sync in (("sync", True), ("async", False)):
+        with tempfile.TemporaryDirectory() as directory:
+            neuron = make_validator(os.path.join(directory, "benchmark.db"), sync)
+            rate, lag = asyncio.run(measure(neuron, args.synapses, args.miners))
+        print(f"{name:<6} {rate:>8.0f} synapses/s   max event loop stall {lag * 1000:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
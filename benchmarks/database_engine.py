@@ -0,0 +1,124 @@
+"""
+Insert and update throughput of the validator database, default SQLite engine against the tuned one.
+
+Every operation commits on its own, like the settlement and request paths of the validator do.
+
+Usage:
+    python benchmarks/database_engine.py --rows 2000 --threads 4
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+import template.validator.db.models as models
+from template.validator.database import create_db_engine
+
+
+def default_engine(path):
+    # The engine of the validator before it was tuned, without the SQL echo.
+    return create_engine(f"sqlite:///{path}")
+
+
+def arbitrage(miner_hotkey):
+    return models.Arbitrage(
+        miner_hotkey=miner_hotkey,
+        pair="BTC/USDT",
+        exchange_from="binance",
+        exchange_to="okx",
+        price_from=100.0,
+        price_to=101.0,
+        fees_from=0.001,
+        fees_to=0.001,
+        amount=100.0,
+        timestamp=int(time.time()),
+        profit=0.008,
+    )
+
+
+def insert_rows(session_factory, rows, miner_hotkey="hotkey"):
+    for _ in range(rows):
+        with session_factory() as db:
+            db.add(arbitrage(miner_hotkey))
+            db.commit()
+
+
+def update_rows(session_factory, rows, miners):
+    for i in range(rows):
+        with session_factory() as db:
+            db.execute(
+                update(models.Miner)
+                .where(models.Miner.miner_hotkey == f"hotkey{i % miners}")
+                .values(last_amount=10000 - i, transaction_count=i)
+            )
+            db.commit()
+
+
+def concurrent_inserts(session_factory, rows, threads):
+    workers = [
+        threading.Thread(
+            target=insert_rows, args=(session_factory, rows // threads, f"hotkey{t}")
+        )
+        for t in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def run(name, make_engine, rows, threads, miners=100):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(os.path.join(directory, "benchmark.db"))
+        models.Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+
+        with session_factory() as db:
+            db.add_all(
+                models.Miner(
+                    miner_hotkey=f"hotkey{i}",
+                    last_amount=10000,
+                    transaction_count=0,
+                    last_updated=int(time.time()),
+                )
+                for i in range(miners)
+            )
+            db.commit()
+
+        results = {}
+        for label, workload in (
+            ("insert", lambda: insert_rows(session_factory, rows)),
+            ("update", lambda: update_rows(session_factory, rows, miners)),
+            (f"insert x{threads}", lambda: concurrent_inserts(session_factory, rows, threads)),
+        ):
+            start = time.perf_counter()
+            workload()
+            results[label] = rows / (time.perf_counter() - start)
+
+        engine.dispose()
+
+    print(f"{name:<8}" + "".join(f"{label:>14}: {rate:>8.0f}/s" for label, rate in results.items()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    before = run("default", default_engine, args.rows, args.threads)
+    after = run("tuned", create_db_engine, args.rows, args.threads)
+    print(
+        f"{'speedup':<8}"
+        + "".join(f"{label:>14}: {after[label] / before[label]:>8.1f}x " for label in before)
+    )
+
+
+if __name__ == "__main__":
+    main()
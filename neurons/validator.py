@@ -19,13 +19,13 @@
 
 import asyncio
 import time
+from typing import List
 from datetime import timedelta
 import logging
 import ccxt
 
 from concurrent.futures import ThreadPoolExecutor
 
-from sqlalchemy.orm import Session
 from datetime import datetime
 
 # Bittensor
@@ -39,58 +39,32 @@ from template.base.validator import BaseValidatorNeuron
 
 # Bittensor Validator Template:
 from template.validator import crud
-from template.validator.database import SessionLocal, engine
-from template.validator.db.models import Base
-from template.validator.schemas import (
-    Miner,
-    Arbitrage,
-)
+from template.validator.database import async_session_scope, session_scope
+from template.validator.exchanges import exchange_registry
+from template.validator.tickers import ticker_cache
+from template.validator.fees import DEFAULT_FEE, fee_table
+from template.validator.settlement import PendingSettlement, SettlementScheduler
+from template.validator.schemas import SettlementCreate
+from template.utils.misc import KeyedLock
+import template.validator.db.models as models
 
-DATABASE_URL = "sqlite:///example.db"
-database_path = DATABASE_URL.split("sqlite///")[-1]
-
-if not os.path.exists(database_path):
-    Base.metadata.create_all(bind=engine)
-
-db: Session = SessionLocal()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def fetch_prices(exchange_id, symbol):
-    price = None
-    fees = 0.002  # Default fee value
-
-    try:
-        # Initialize the exchange
-        exchange = getattr(ccxt, exchange_id)()
+def fetch_ticker(exchange_id, symbol):
+    # Blocking ccxt call, run it in an executor from async code
+    # Reuse the pooled exchange, its markets are already loaded
+    exchange = exchange_registry.get(exchange_id)
 
-        # Load markets to ensure the exchange is ready
-        exchange.load_markets()  # Ensure markets are loaded
+    return exchange.fetch_ticker(symbol)
 
-        # Fetch the ticker price
-        ticker = exchange.fetch_ticker(symbol)
-        price = ticker["last"]
 
-        # Fetch trading fees if available
-        if exchange.has["fetchTradingFees"]:
-            trading_fees = exchange.fetch_trading_fees()
-            fees = trading_fees[symbol]["maker"]
-
-    except (ccxt.NetworkError, ccxt.ExchangeError) as e:
-        logger.error(
-            f"Error fetching price or fees from {exchange_id} for {symbol}: {e}"
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
-
-    logger.info(
-        f"The price and fees of {symbol} on {exchange_id} is {price} and {fees}"
-    )
-
-    return {"price": price, "fees": fees}
+def fetch_fees(exchange_id, symbol):
+    # Blocking the first time an exchange is used, run it in an executor from async code
+    return fee_table.get(exchange_id, symbol)
 
 
 class Validator(BaseValidatorNeuron):
@@ -108,8 +82,42 @@ class Validator(BaseValidatorNeuron):
         bt.logging.info("load_state()")
         self.load_state()
 
+        # Load the markets of the configured exchanges once, they are reused by every synapse.
+        exchange_registry.refresh_interval = self.config.neuron.markets_refresh_interval
+        exchange_registry.start(self.config.neuron.exchanges)
+
+        ticker_cache.max_age = self.config.neuron.ticker_max_age
+        fee_table.refresh_interval = self.config.neuron.fees_refresh_interval
+
+        # Bounded pool for the blocking ccxt calls so they never run on the axon event loop.
+        self.fetch_executor = ThreadPoolExecutor(
+            max_workers=self.config.neuron.fetch_workers,
+            thread_name_prefix="fetch_prices",
+        )
+
+        # Serializes the balance changes of each miner.
+        self.miner_locks = KeyedLock()
+
+        # Pending sell legs wait on a timer heap instead of a sleeping thread each.
+        self.settlements = SettlementScheduler(
+            self.run_transaction, workers=self.config.neuron.settlement_workers
+        )
+        # Replay the sell legs that were still pending when the validator stopped.
+        with session_scope() as db:
+            pending = crud.settlement.get_pending(db)
+        self.settlements.load(pending)
+        bt.logging.info(f"Replaying {len(pending)} pending settlements")
+        self.settlements.start()
+
         # TODO(developer): Anything specific to your use case you can do here
 
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Settle what is due before the base class flushes the ledger.
+        self.settlements.stop()
+        super().__exit__(exc_type, exc_value, traceback)
+        exchange_registry.stop()
+        self.fetch_executor.shutdown(wait=False)
+
     async def forward(self, synapse: template.protocol.ArbitrageData):
         """
         Validator forward pass. Consists of:
@@ -122,7 +130,100 @@ class Validator(BaseValidatorNeuron):
         # TODO(developer): Rewrite this function based on your protocol definition.
         pass
 
-    def run_transaction(
+    async def run_blocking(self, fn, *args):
+        """Runs a blocking exchange call in the fetch executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.fetch_executor, fn, *args)
+
+    async def fetch_prices(self, exchange_id, symbol):
+        price = None
+        fees = DEFAULT_FEE
+
+        try:
+            # Concurrent requests for the same ticker share one upstream call
+            ticker = await ticker_cache.get(
+                exchange_id,
+                symbol,
+                lambda: self.run_blocking(fetch_ticker, exchange_id, symbol),
+            )
+            price = ticker["last"]
+
+            fees = await self.run_blocking(fetch_fees, exchange_id, symbol)
+
+        except (ccxt.NetworkError, ccxt.ExchangeError) as e:
+            logger.error(
+                f"Error fetching price or fees from {exchange_id} for {symbol}: {e}"
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}")
+
+        logger.info(
+            f"The price and fees of {symbol} on {exchange_id} is {price} and {fees}"
+        )
+
+        return {"price": price, "fees": fees}
+
+    async def fetch_leg(self, exchange_id, symbol):
+        """Fetches the price and fees of one leg off the event loop, giving up after `neuron.fetch_timeout`."""
+        try:
+            return await asyncio.wait_for(
+                self.fetch_prices(exchange_id, symbol),
+                timeout=self.config.neuron.fetch_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out fetching price of {symbol} from {exchange_id}")
+            return {"price": None, "fees": DEFAULT_FEE}
+
+    def run_transaction(self, settlements: List[PendingSettlement]):
+        # Completes a batch of due sell legs in one transaction, called by the settlement scheduler
+        settled = []
+        try:
+            with session_scope() as db:
+                for settlement in settlements:
+                    if settlement.miner_hotkey not in self.ledger:
+                        logger.error(
+                            f"Miner {settlement.miner_hotkey} no longer exists, dropping its sell leg"
+                        )
+                        continue
+
+                    # Create arbitrage entry
+                    db.add(
+                        models.Arbitrage(
+                            miner_hotkey=settlement.miner_hotkey,
+                            pair=settlement.pair,
+                            exchange_from=settlement.exchange_from,
+                            exchange_to=settlement.exchange_to,
+                            price_from=settlement.price_from,
+                            price_to=settlement.price_to,
+                            fees_from=settlement.fees_from,
+                            fees_to=settlement.fees_to,
+                            amount=settlement.amount,
+                            timestamp=int(time.time()),
+                            profit=settlement.profit,
+                        )
+                    )
+                    settled.append(settlement)
+
+                # The persisted sell legs are removed in the same transaction they settle in
+                crud.settlement.remove_many(
+                    db=db, ids=[settlement.id for settlement in settlements]
+                )
+
+        except Exception as e:
+            logger.error(f"Error during transaction for {len(settlements)} sell legs: {e}")
+            raise
+
+        # Update for Selling, only once the trades are recorded
+        for settlement in settled:
+            self.ledger.credit(
+                settlement.miner_hotkey,
+                settlement.proceeds,
+                profit=settlement.amount * settlement.profit,
+            )
+
+        logger.info(f"Transactions completed for {len(settled)} sell legs")
+
+    async def schedule_transaction(
         self,
         synapse,
         miner_hotkey,
@@ -132,51 +233,40 @@ class Validator(BaseValidatorNeuron):
         price1,
         price2,
     ):
-        # This function runs the transaction logic in a separate thread
-        try:
-            miner_db = crud.miner.get_miner(db=db, miner_hotkey=miner_hotkey)
-            if not miner_db:
-                # Handle creating a new miner
-                # (Same logic as before)
-                pass
-
-            time.sleep(300)  # Simulating transaction time (5 minutes)
-
-            # Update for Selling
-            crud.miner.update(
-                db=db,
-                db_obj=miner_db,
-                obj_in=Miner(
-                    miner_hotkey=miner_hotkey,
-                    last_updated=(datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
-                    last_amount=miner_db.last_amount
-                    + amount_for_buying * (1 - fees1) * price2 * (1 - fees2) / price1,
-                    transaction_count=miner_db.transaction_count + 1,
-                ),
-            )
+        # The sell leg completes after the simulated transaction time without holding the request open
+        settlement = PendingSettlement(
+            miner_hotkey=miner_hotkey,
+            pair=synapse.pair,
+            exchange_from=synapse.exchange1,
+            exchange_to=synapse.exchange2,
+            price_from=price1,
+            price_to=price2,
+            fees_from=fees1,
+            fees_to=fees2,
+            amount=amount_for_buying,
+            due_at=time.time() + self.config.neuron.settlement_delay,
+        )
 
-            # Create arbitrage entry
-            crud.arbitrage.create(
+        # Persist it first so a restart does not lose the miner's money, without blocking the event loop
+        async with async_session_scope(write=True) as db:
+            created = await crud.async_settlement.create(
                 db=db,
-                obj_in=Arbitrage(
-                    miner_hotkey=miner_hotkey,
-                    pair=synapse.pair,
-                    exchange_from=synapse.exchange1,
-                    exchange_to=synapse.exchange2,
-                    price_from=price1,
-                    price_to=price2,
-                    fees_from=fees1,
-                    fees_to=fees2,
-                    amount=amount_for_buying,
-                    timestamp=(datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
-                    profit=(1 - fees1) * price2 * (1 - fees2) / price1 - 1,
+                obj_in=SettlementCreate(
+                    miner_hotkey=settlement.miner_hotkey,
+                    pair=settlement.pair,
+                    exchange_from=settlement.exchange_from,
+                    exchange_to=settlement.exchange_to,
+                    price_from=settlement.price_from,
+                    price_to=settlement.price_to,
+                    fees_from=settlement.fees_from,
+                    fees_to=settlement.fees_to,
+                    amount=settlement.amount,
+                    due_at=settlement.due_at,
                 ),
             )
+            settlement.id = created.id
 
-            logger.info(f"Transaction completed for miner {miner_hotkey}")
-
-        except Exception as e:
-            logger.error(f"Error during transaction for {miner_hotkey}: {e}")
+        self.settlements.schedule(settlement)
 
     async def forward_arbitrage(
         self, synapse: template.protocol.ArbitrageData
@@ -205,8 +295,11 @@ class Validator(BaseValidatorNeuron):
 
                 return synapse
 
-            data1 = await fetch_prices(synapse.exchange1, synapse.pair.upper())
-            data2 = await fetch_prices(synapse.exchange2, synapse.pair.upper())
+            # Fetch both legs concurrently
+            data1, data2 = await asyncio.gather(
+                self.fetch_leg(synapse.exchange1, synapse.pair.upper()),
+                self.fetch_leg(synapse.exchange2, synapse.pair.upper()),
+            )
             price1 = data1["price"]
             price2 = data2["price"]
             fees1 = data1["fees"]
@@ -219,64 +312,27 @@ class Validator(BaseValidatorNeuron):
 
                 return synapse
 
-            miner_db = crud.miner.get_miner(db=db, miner_hotkey=miner_hotkey)
-
-            # if there is no miner data then create a new one
-            if not miner_db:
-                # Create new miner entry
-                crud.miner.create(
-                    db=db,
-                    obj_in=Miner(
-                        miner_hotkey=miner_hotkey,
-                        last_updated=(datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
-                        last_amount=10000,
-                        transaction_count=0,
-                    ),
-                )
+            # Balance changes of one miner are serialized, other miners are not held up
+            async with self.miner_locks(miner_hotkey):
+                # if there is no miner data then create a new one
+                if self.ledger.create(miner_hotkey, 10000):
+                    print(f"Created new miner entry for miner_hotkey: {miner_hotkey}")
 
-                print(f"Created new miner entry for miner_hotkey: {miner_hotkey}")
-
-                miner_db = crud.miner.get_miner(db=db, miner_hotkey=miner_hotkey)
-                last_amount = miner_db.last_amount
-
-                # Update for Buying transaction
-                crud.miner.update(
-                    db=db,
-                    db_obj=miner_db,
-                    obj_in=Miner(
-                        miner_hotkey=miner_hotkey,
-                        last_updated=(datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
-                        last_amount=last_amount
-                        - last_amount * synapse.amount * (1 + fees1),
-                        transaction_count=miner_db.transaction_count,
-                    ),
-                )
+                # Update for Buying transaction, read and written atomically
+                bought = self.ledger.debit(miner_hotkey, synapse.amount, fees1)
 
-                amount_for_buying = (last_amount) * (synapse.amount)
-                synapse.message = "Data updated successfully"
-                synapse.status_code = 200
-                synapse.after_amount = (
-                    last_amount
-                    + amount_for_buying * (1 - fees1) * price2 * (1 - fees2) / price1
-                )
+                # If the current amount is 0 then return error
+                if bought is None:
+                    print("Amount is greater than current amount")
+                    synapse.message = "Your amount is not sufficient to operate arbitrage"
+                    synapse.status_code = 404
+                    synapse.after_amount = False
+                    return synapse
+
+                last_amount, amount_for_buying = bought
 
-                # Use TreadPoolExecutor to run the transaction in a separate thread
-                # with ThreadPoolExecutor() as executor:
-                #     executor.submit(
-                #         self.run_transaction,
-                #         synapse,
-                #         miner_hotkey,
-                #         amount_for_buying,
-                #         fees1,
-                #         fees2,
-                #         price1,
-                #         price2,
-                #     )
-
-                with ThreadPoolExecutor() as executor:
-                    await asyncio.get_event_loop().run_in_executor(
-                        executor,
-                        self.run_transaction,
+                try:
+                    await self.schedule_transaction(
                         synapse,
                         miner_hotkey,
                         amount_for_buying,
@@ -285,32 +341,12 @@ class Validator(BaseValidatorNeuron):
                         price1,
                         price2,
                     )
-
-                return synapse
-
-            # If there is miner data then update the data
-
-            # If the current amount is 0 then return error
-            if miner_db.last_amount <= 0:
-                print("Amount is greater than current amount")
-                synapse.message = "Your amount is not sufficient to operate arbitrage"
-                synapse.status_code = 404
-                synapse.after_amount = False
-                return synapse
-
-            amount_for_buying = (miner_db.last_amount) * (synapse.amount)
-            last_amount = miner_db.last_amount
-            # Update for Buying transaction
-            crud.miner.update(
-                db=db,
-                db_obj=miner_db,
-                obj_in=Miner(
-                    miner_hotkey=miner_db.miner_hotkey,
-                    last_updated=(datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
-                    last_amount=last_amount - amount_for_buying * (1 + fees1),
-                    transaction_count=miner_db.transaction_count,
-                ),
-            )
+                except Exception:
+                    # Without a sell leg the buy never happened, give the money back
+                    self.ledger.credit(
+                        miner_hotkey, amount_for_buying * (1 + fees1), transactions=0
+                    )
+                    raise
 
             synapse.message = "Data updated successfully"
             synapse.status_code = 200
@@ -318,31 +354,6 @@ class Validator(BaseValidatorNeuron):
                 last_amount
                 + amount_for_buying * (1 - fees1) * price2 * (1 - fees2) / price1
             )
-            # Use TreadPoolExecutor to run the transaction in a separate thread
-            # with ThreadPoolExecutor() as executor:
-            #     executor.submit(
-            #         self.run_transaction,
-            #         synapse,
-            #         miner_hotkey,
-            #         amount_for_buying,
-            #         fees1,
-            #         fees2,
-            #         price1,
-            #         price2,
-            #     )
-
-            with ThreadPoolExecutor() as executor:
-                await asyncio.get_event_loop().run_in_executor(
-                    executor,
-                    self.run_transaction,
-                    synapse,
-                    miner_hotkey,
-                    amount_for_buying,
-                    fees1,
-                    fees2,
-                    price1,
-                    price2,
-                )
 
             return synapse
 
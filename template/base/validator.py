@@ -18,6 +18,7 @@
 # DEALINGS IN THE SOFTWARE.
 
 
+import os
 import time
 from abc import abstractmethod
 from datetime import timedelta
@@ -28,7 +29,6 @@ import argparse
 import threading
 import bittensor as bt
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime
 from typing import List, Union
 from traceback import print_exception
@@ -41,15 +41,12 @@ from template.base.utils.weight_utils import (
 from template.mock import MockDendrite
 from template.utils.config import add_validator_args
 from template.validator import crud
-from template.validator.database import SessionLocal, engine
+from template.validator.database import SessionLocal, async_session_scope, init_db
+from template.validator.db.migrations import migrate
+from template.validator.jobs import JobScheduler
+from template.validator.ledger import MinerLedger
+from template.validator.reward import weighted_profits
 import template.validator.db.models as models
-from template.validator.schemas import (
-    Miner,
-    Day,
-)
-
-
-db: Session = SessionLocal()
 
 
 class BaseValidatorNeuron(BaseNeuron):
@@ -76,6 +73,7 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # Save a copy of the hotkeys to local memory.
         self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.index_hotkeys()
 
         # Dendrite lets us send messages to other nodes (axons) in the network.
         if self.config.mock:
@@ -112,6 +110,25 @@ class BaseValidatorNeuron(BaseNeuron):
         self.thread: Union[threading.Thread, None] = None
         self.lock = asyncio.Lock()
 
+        # Creates the database, or upgrades the schema of an existing one.
+        migrate(init_db(self.config))
+
+        # Miner balances live in memory and are written back to the database in batches.
+        self.ledger = MinerLedger(
+            SessionLocal, flush_interval=self.config.neuron.ledger_flush_interval
+        )
+        self.ledger.load()
+        self.ledger.start()
+
+        # The daily rollup and scoring pass run on a UTC calendar from the main loop.
+        self.jobs = JobScheduler(os.path.join(self.config.neuron.full_path, "jobs.json"))
+        self.jobs.add(
+            "daily_update",
+            self.daily_update,
+            interval=self.config.neuron.daily_update_interval,
+            offset=self.config.neuron.daily_update_offset,
+        )
+
     def serve_axon(self):
         """Serve axon to enable external connections."""
 
@@ -178,11 +195,13 @@ class BaseValidatorNeuron(BaseNeuron):
         try:
             while not self.should_exit:
                 bt.logging.info(f"step({self.step}) block({self.block})")
-                self.loop.run_until_complete(self.schedule_miners_update())
                 while (
                     self.block - self.metagraph.last_update[self.uid]
                     < self.config.neuron.epoch_length
                 ):
+                    # Run the scheduled jobs that are due, between block checks.
+                    self.loop.run_until_complete(self.jobs.run_pending())
+
                     # Wait before checking again.
                     time.sleep(1)
 
@@ -253,135 +272,64 @@ class BaseValidatorNeuron(BaseNeuron):
             self.is_running = False
             bt.logging.debug("Stopped")
 
+        # Write the balances changed since the last flush.
+        self.ledger.stop()
+
     async def get_arbitrage_sum(
         self, db: Session, miner_hotkey: str, transaction_count: int
     ):
-        result = (
-            db.query(func.sum(models.Arbitrage.amount * models.Arbitrage.profit))
-            .filter(models.Arbitrage.miner_hotkey == miner_hotkey)
-            .order_by(models.Arbitrage.timestamp.desc())
-            .limit(transaction_count)
-            .scalar()
+        # The running total is self.ledger.day_profit, this recomputes it from the trades
+        return crud.arbitrage.get_profit_sum(
+            db, miner_hotkey=miner_hotkey, limit=transaction_count
         )
 
-        return result
-
     async def update_miners(self):
-        current_time = datetime.now()
-        miners = crud.miner.get_all_miners(db=db)
-        # Assuming you have a method to get all miners
-        # last_updated = datetime.strptime(miners[1].last_updated, "%Y-%m-%d %H:%M:%S")
-        # if current_time - last_updated > timedelta(seconds=1):
-        #         bt.logging.info(f"Deleting miner {miners[1].miner_hotkey} due to inactivity.")
-        #         crud.miner.delete(db=db, miner_hotkey=miners[1].miner_hotkey)  # Assuming you have a method to delete miners
-
-        if miners:
-            for miner in miners:
-                last_updated = datetime.strptime(
-                    miner.last_updated, "%Y-%m-%d %H:%M:%S"
-                )
+        now = int(time.time())
+        inactive_before = now - int(timedelta(days=7).total_seconds())
+
+        # Balance changes wait for the rollup, so the ledger can be reloaded from its result.
+        with self.ledger.locked():
+            # Write pending balance changes so the rollup sees every settled trade
+            self.ledger.flush()
+
+            start = time.perf_counter()
+            async with async_session_scope(write=True) as db:
+                removed = await crud.async_miner.remove_inactive(db, before=inactive_before)
+                # Set the total_profit for every miner that traded today
+                days = await crud.async_day.create_daily_totals(db, timestamp=now)
+                # Reset last_amount to a specific value if required (e.g., 10000)
+                await crud.async_miner.reset_balances(db, last_amount=10000)
+
+            self.ledger.load()
+
+        for miner_hotkey in removed:
+            bt.logging.info(f"Deleted miner {miner_hotkey} due to inactivity.")
+        bt.logging.info(
+            f"Set the total of {days} miners and deleted {len(removed)} in {time.perf_counter() - start:.3f}s"
+        )
 
-                # Check if last_updated is older than 7 days
-                if current_time - last_updated > timedelta(days=7):
-                    bt.logging.info(
-                        f"Deleting miner {miner.miner_hotkey} due to inactivity."
-                    )
-                    crud.miner.delete(
-                        db=db, miner_hotkey=miner.miner_hotkey
-                    )  # Assuming you have a method to delete miners
-                else:
-                    now = datetime.now()
-                    bt.logging.info(
-                        f"Setting the total of miner {miner.miner_hotkey} for {now}."
-                    )
-                    # Set the total_profit for a miner every day
-
-                    if miner.transaction_count == 0:
-                        continue
-
-                    crud.day.create(
-                        db=db,
-                        obj_in=Day(
-                            miner_hotkey=miner.miner_hotkey,
-                            total_profit=await self.get_arbitrage_sum(
-                                db=db,
-                                miner_hotkey=miner.miner_hotkey,
-                                transaction_count=miner.transaction_count,
-                            ),
-                            timestamp=now.strftime("%Y-%m-%d %H:%M:%S"),
-                        ),
-                    )
-                    # Reset last_amount to a specific value if required (e.g., 10000)
-                    bt.logging.info(
-                        f"Resetting last_amount for miner {miner.miner_hotkey}."
-                    )
-                    crud.miner.update(
-                        db=db,
-                        db_obj=miner,
-                        obj_in=Miner(
-                            miner_hotkey=miner.miner_hotkey,
-                            last_updated=miner.last_updated,
-                            last_amount=10000,  # or any other value as needed
-                            transaction_count=0,
-                        ),
-                    )
-
-    async def schedule_miners_update(self):
-        # Schedule the update_miners function to run at midnight every day
-        while True:
-            now = datetime.now()
-            midnight = (now + timedelta(days=1)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            # await asyncio.sleep((midnight - now).total_seconds())
-            await asyncio.sleep(2000)  # Accumulate data for 1 hour and initiate
-            await self.update_miners()
-            await self.reward_distribution()
+    async def daily_update(self):
+        # Close the day of every miner, then score the miners on their last days
+        await self.update_miners()
+        await self.reward_distribution()
 
     async def reward_distribution(self):
 
         # return await forward(self)
-        miner_hotkeys = []
-        miner_profits = []
-
-        result = db.query(models.Miner.miner_hotkey).all()
-        for miner_hotkey in result:
-            miner_hotkeys.append(miner_hotkey[0])
-
-        miner_uids = [
-            np.where(self.hotkeys == miner_hotkey)[0][0]
-            for miner_hotkey in miner_hotkeys
-            if miner_hotkey in self.hotkeys
-        ]
-
-        # Calculate the total profit of a week for each miner
-        for miner_hotkey in miner_hotkeys:
-            total_profits = (
-                db.query(models.Day.total_profit)
-                .filter(models.Day.miner_hotkey == miner_hotkey)
-                .order_by(models.Day.timestamp.desc())
-                .limit(7)
-                .all()
-            )
-
-            if total_profits:
-                n = len(total_profits)
-                weighted_sum = 0
-                total_weight = 0
+        miner_hotkeys = self.ledger.hotkeys()
 
-                for i, profit in enumerate(total_profits):
-                    weight = n - i
-                    weighted_sum += profit.total_profit * weight
-                    total_weight += weight
+        # Calculate the weighted total profit of a week for each miner
+        async with async_session_scope() as db:
+            profits, has_history = await db.run_sync(weighted_profits, miner_hotkeys)
 
-                weighted_average = weighted_sum / total_weight if total_weight else 0
-
-                miner_profits.append(weighted_average)
-
-        self.update_scores(
-            np.array([miner_profit for miner_profit in miner_profits]),
-            miner_uids,
+        # Only registered miners with history are rewarded, keep their uids and profits aligned.
+        uids = np.array(
+            [self.hotkey_to_uid.get(miner_hotkey, -1) for miner_hotkey in miner_hotkeys],
+            dtype=int,
         )
+        rewarded = has_history & (uids >= 0)
+
+        self.update_scores(profits[rewarded], uids[rewarded])
 
     def set_weights(self):
         """
@@ -480,6 +428,11 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # Update the hotkeys.
         self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.index_hotkeys()
+
+    def index_hotkeys(self):
+        """Rebuilds the hotkey to uid index, call it whenever `self.hotkeys` changes."""
+        self.hotkey_to_uid = {hotkey: uid for uid, hotkey in enumerate(self.hotkeys)}
 
     def update_scores(self, rewards: np.ndarray, uids: List[int]):
         """Performs exponential moving average on the scores based on the rewards received from the miners."""
@@ -547,3 +500,4 @@ class BaseValidatorNeuron(BaseNeuron):
         self.step = state["step"]
         self.scores = state["scores"]
         self.hotkeys = state["hotkeys"]
+        self.index_hotkeys()
@@ -235,6 +235,119 @@ def add_validator_args(cls, parser):
         default=4096,
     )
 
+    parser.add_argument(
+        "--neuron.exchanges",
+        type=str,
+        nargs="*",
+        help="Exchanges whose markets are loaded at startup. Other exchanges are loaded on first use.",
+        default=["binance", "bybit", "okx", "kucoin", "gateio", "coinbase", "kraken"],
+    )
+
+    parser.add_argument(
+        "--neuron.markets_refresh_interval",
+        type=float,
+        help="How often, in seconds, the markets of pooled exchanges are reloaded.",
+        default=3600,
+    )
+
+    parser.add_argument(
+        "--neuron.fees_refresh_interval",
+        type=float,
+        help="How often, in seconds, the trading fee table of an exchange is reloaded.",
+        default=6 * 3600,
+    )
+
+    parser.add_argument(
+        "--neuron.fetch_timeout",
+        type=float,
+        help="Timeout in seconds for fetching the price of one leg of an arbitrage.",
+        default=5,
+    )
+
+    parser.add_argument(
+        "--neuron.ticker_max_age",
+        type=float,
+        help="Maximum age in seconds of a cached ticker served to a synapse.",
+        default=3,
+    )
+
+    parser.add_argument(
+        "--neuron.fetch_workers",
+        type=int,
+        help="Number of worker threads used to fetch prices from exchanges.",
+        default=16,
+    )
+
+    parser.add_argument(
+        "--neuron.settlement_delay",
+        type=float,
+        help="Simulated transaction time in seconds before the sell leg of an arbitrage settles.",
+        default=300,
+    )
+
+    parser.add_argument(
+        "--neuron.settlement_workers",
+        type=int,
+        help="Number of worker threads settling due sell legs.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--neuron.ledger_flush_interval",
+        type=float,
+        help="How often, in seconds, changed miner balances are written to the database.",
+        default=30,
+    )
+
+    parser.add_argument(
+        "--neuron.daily_update_interval",
+        type=float,
+        help="Seconds between the miner rollups and scoring passes, aligned to UTC midnight.",
+        default=24 * 60 * 60,
+    )
+
+    parser.add_argument(
+        "--neuron.daily_update_offset",
+        type=float,
+        help="Seconds after UTC midnight the miner rollup and scoring pass are due.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.database_path",
+        type=str,
+        help="Path of the SQLite database of the validator.",
+        default="example.db",
+    )
+
+    parser.add_argument(
+        "--neuron.database_echo",
+        action="store_true",
+        help="If set, every SQL statement is logged.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.database_busy_timeout",
+        type=int,
+        help="Milliseconds a database connection waits for a lock before failing.",
+        default=5000,
+    )
+
+    parser.add_argument(
+        "--neuron.database_cache_size",
+        type=int,
+        help="Page cache of each database connection in KiB.",
+        default=64 * 1024,
+    )
+
+    parser.add_argument(
+        "--neuron.database_mmap_size",
+        type=int,
+        help="Bytes of the database file read through memory mapping, 0 to disable.",
+        default=256 * 1024 * 1024,
+    )
+
     parser.add_argument(
         "--wandb.project_name",
         type=str,
@@ -18,10 +18,12 @@
 
 import time
 import math
+import asyncio
 import hashlib as rpccheckhealth
 from math import floor
-from typing import Callable, Any
+from typing import Callable, Any, Dict, Hashable
 from functools import lru_cache, update_wrapper
+from contextlib import asynccontextmanager
 
 
 # LRU Cache with TTL
@@ -110,3 +112,39 @@ def ttl_get_block(self) -> int:
     Note: self here is the miner or validator instance
     """
     return self.subtensor.get_current_block()
+
+
+class KeyedLock:
+    """
+    One asyncio lock per key, created on first use and dropped once nobody holds or waits for it.
+
+    Callers with the same key run one at a time while callers with different keys never wait on each other.
+
+    Example:
+        async with locks("some_hotkey"):
+            # Critical section for "some_hotkey"
+            ...
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self._users: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def __call__(self, key: Hashable):
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._users[key] = self._users.get(key, 0) + 1
+
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[key] -= 1
+            if self._users[key] == 0:
+                del self._users[key]
+                del self._locks[key]
@@ -1,3 +1,4 @@
-from .crud_miner import miner
-from .crud_arbitrage import arbitrage
-from .crud_day import day
\ No newline at end of file
+from .crud_miner import miner, async_miner
+from .crud_arbitrage import arbitrage, async_arbitrage
+from .crud_day import day, async_day
+from .crud_settlement import settlement, async_settlement
\ No newline at end of file
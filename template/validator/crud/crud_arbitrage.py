@@ -1,14 +1,45 @@
-from template.validator.crud.base import CRUDBase
-from template.validator.db.models import Arbitrage
+from template.validator.crud.base import AsyncCRUDBase, CRUDBase
+from template.validator.db.models import Arbitrage, Miner
 
 from typing import Any, Dict, Optional, Union, List
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import update, delete, tuple_
+from sqlalchemy import update, delete, tuple_, func, select
 from template.validator.schemas.arbitrage import ArbitrageCreate, ArbitrageUpdate
 import asyncio
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import text
+
+
+def _profit_sum_statement(miner_hotkey: str, limit: int):
+    latest = (
+        select((Arbitrage.amount * Arbitrage.profit).label("profit"))
+        .where(Arbitrage.miner_hotkey == miner_hotkey)
+        .order_by(Arbitrage.timestamp.desc(), Arbitrage.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    return select(func.coalesce(func.sum(latest.c.profit), 0.0))
+
+
+def _recent_profits_statement():
+    ranked = select(
+        Arbitrage.miner_hotkey,
+        (Arbitrage.amount * Arbitrage.profit).label("profit"),
+        func.row_number()
+        .over(
+            partition_by=Arbitrage.miner_hotkey,
+            order_by=(Arbitrage.timestamp.desc(), Arbitrage.id.desc()),
+        )
+        .label("rank"),
+    ).subquery()
+
+    return (
+        select(ranked.c.miner_hotkey, func.sum(ranked.c.profit))
+        .join(Miner, Miner.miner_hotkey == ranked.c.miner_hotkey)
+        .where(Miner.transaction_count > 0, ranked.c.rank <= Miner.transaction_count)
+        .group_by(ranked.c.miner_hotkey)
+    )
 
 
 class CRUDArbitrage(CRUDBase[Arbitrage, ArbitrageCreate, ArbitrageUpdate]):
@@ -24,6 +55,19 @@ class CRUDArbitrage(CRUDBase[Arbitrage, ArbitrageCreate, ArbitrageUpdate]):
         result = db.query(Arbitrage).all()
         return result
 
+    def get_profit_sum(self, db: Session, *, miner_hotkey: str, limit: int) -> float:
+        """Sum of amount * profit over the latest `limit` trades of a miner, one range scan of its index."""
+        return db.execute(_profit_sum_statement(miner_hotkey, limit)).scalar()
+
+    def get_recent_profits(self, db: Session) -> Dict[str, float]:
+        """
+        Sum of amount * profit over the latest transaction_count trades of every miner that traded.
+
+        Recomputes from the arbitrage table what the miner day profits accumulate, for audits. Reads the whole
+        table, do not call it on the request path.
+        """
+        return dict(db.execute(_recent_profits_statement()).all())
+
     def update(
         self,
         db: Session,
@@ -43,8 +87,6 @@ class CRUDArbitrage(CRUDBase[Arbitrage, ArbitrageCreate, ArbitrageUpdate]):
     ) -> None:
         try:
             # Get all current records in the database
-            db.execute(text("PRAGMA journal_mode=WAL;"))
-
             update_identifiers = set(
                 (record["pair"], record["exchange_from"], record["exchange_to"])
                 for record in update_values
@@ -107,4 +149,19 @@ class CRUDArbitrage(CRUDBase[Arbitrage, ArbitrageCreate, ArbitrageUpdate]):
             raise e
 
 
+class AsyncCRUDArbitrage(AsyncCRUDBase[Arbitrage, ArbitrageCreate, ArbitrageUpdate]):
+    async def get_arbitrages(self, db: AsyncSession, *, miner_hotkey: str) -> List[Arbitrage]:
+        result = await db.execute(select(Arbitrage).where(Arbitrage.miner_hotkey == miner_hotkey))
+        return result.scalars().all()
+
+    async def get_profit_sum(self, db: AsyncSession, *, miner_hotkey: str, limit: int) -> float:
+        """Sum of amount * profit over the latest `limit` trades of a miner, see CRUDArbitrage."""
+        return (await db.execute(_profit_sum_statement(miner_hotkey, limit))).scalar()
+
+    async def get_recent_profits(self, db: AsyncSession) -> Dict[str, float]:
+        """Per-miner sum over its latest transaction_count trades, see CRUDArbitrage."""
+        return dict((await db.execute(_recent_profits_statement())).all())
+
+
 arbitrage = CRUDArbitrage(Arbitrage)
+async_arbitrage = AsyncCRUDArbitrage(Arbitrage)
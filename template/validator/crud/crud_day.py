@@ -1,14 +1,23 @@
-from template.validator.crud.base import CRUDBase
-from template.validator.db.models import Day
+from template.validator.crud.base import AsyncCRUDBase, CRUDBase
+from template.validator.db.models import Day, Miner
 
 from typing import Any, Dict, Optional, Union, List
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import update, delete, tuple_
+from sqlalchemy import update, delete, tuple_, literal, select
 from template.validator.schemas.day import DayCreate, DayUpdate
 import asyncio
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import text
+
+
+def _daily_totals_statement(timestamp: int):
+    totals = select(Miner.miner_hotkey, Miner.day_profit, literal(timestamp)).where(
+        Miner.transaction_count > 0
+    )
+    return Day.__table__.insert().from_select(
+        ["miner_hotkey", "total_profit", "timestamp"], totals
+    )
 
 
 class CRUDDay(CRUDBase[Day, DayCreate, DayUpdate]):
@@ -24,6 +33,16 @@ class CRUDDay(CRUDBase[Day, DayCreate, DayUpdate]):
         result = db.query(Day).all()
         return result
 
+    def create_daily_totals(self, db: Session, *, timestamp: int) -> int:
+        """
+        Adds a day row for every miner that traded since the last rollup, in one INSERT ... SELECT.
+
+        The totals come from the day profit the ledger accumulates as trades settle, so no arbitrage row is
+        read. Does not commit.
+        """
+        result = db.execute(_daily_totals_statement(timestamp))
+        return result.rowcount
+
     def update(
         self,
         db: Session,
@@ -43,8 +62,6 @@ class CRUDDay(CRUDBase[Day, DayCreate, DayUpdate]):
     ) -> None:
         try:
             # Get all current records in the database
-            db.execute(text("PRAGMA journal_mode=WAL;"))
-
             update_identifiers = set(
                 (record["pair"], record["exchange_from"], record["exchange_to"])
                 for record in update_values
@@ -107,4 +124,16 @@ class CRUDDay(CRUDBase[Day, DayCreate, DayUpdate]):
             raise e
 
 
+class AsyncCRUDDay(AsyncCRUDBase[Day, DayCreate, DayUpdate]):
+    async def get_days(self, db: AsyncSession, *, miner_hotkey: str) -> List[Day]:
+        result = await db.execute(select(Day).where(Day.miner_hotkey == miner_hotkey))
+        return result.scalars().all()
+
+    async def create_daily_totals(self, db: AsyncSession, *, timestamp: int) -> int:
+        """Adds a day row for every miner that traded since the last rollup, see CRUDDay. Does not commit."""
+        result = await db.execute(_daily_totals_statement(timestamp))
+        return result.rowcount
+
+
 day = CRUDDay(Day)
+async_day = AsyncCRUDDay(Day)
@@ -1,14 +1,34 @@
-from template.validator.crud.base import CRUDBase
-from template.validator.db.models import Miner
+from template.validator.crud.base import AsyncCRUDBase, CRUDBase
+from template.validator.db.models import Arbitrage, Day, Miner
 
 from typing import Any, Dict, Optional, Union, List
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import update, delete, tuple_
+from sqlalchemy import update, delete, tuple_, select
 from template.validator.schemas.miner import MinerCreate, MinerUpdate
 import asyncio
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import text
+
+
+def _inactive(before: int):
+    return select(Miner.miner_hotkey).where(Miner.last_updated < before)
+
+
+def _remove_inactive_statements(before: int):
+    # Bulk deletes skip the ORM cascade, remove the history explicitly.
+    return [
+        delete(model).where(model.miner_hotkey.in_(_inactive(before)))
+        for model in (Arbitrage, Day)
+    ] + [delete(Miner).where(Miner.last_updated < before)]
+
+
+def _reset_balances_statement(last_amount: float):
+    return (
+        update(Miner)
+        .where(Miner.transaction_count > 0)
+        .values(last_amount=last_amount, transaction_count=0, day_profit=0.0)
+    )
 
 
 class CRUDMiner(CRUDBase[Miner, MinerCreate, MinerUpdate]):
@@ -45,13 +65,24 @@ class CRUDMiner(CRUDBase[Miner, MinerCreate, MinerUpdate]):
         db.commit()
         return db_obj
 
+    def remove_inactive(self, db: Session, *, before: int) -> List[str]:
+        """Deletes the miners not updated since `before` together with their history. Does not commit."""
+        miner_hotkeys = db.execute(_inactive(before)).scalars().all()
+        if miner_hotkeys:
+            for statement in _remove_inactive_statements(before):
+                db.execute(statement)
+        return miner_hotkeys
+
+    def reset_balances(self, db: Session, *, last_amount: float) -> int:
+        """Restores the balance and clears the trade count and day profit of every miner that traded. Does not commit."""
+        result = db.execute(_reset_balances_statement(last_amount))
+        return result.rowcount
+
     async def batch_update(
         self, db: Session, *, update_values: List[Dict[str, Any]], batch_size: int = 100
     ) -> None:
         try:
             # Get all current records in the database
-            db.execute(text("PRAGMA journal_mode=WAL;"))
-
             update_identifiers = set(
                 (record["pair"], record["exchange_from"], record["exchange_to"])
                 for record in update_values
@@ -112,4 +143,28 @@ class CRUDMiner(CRUDBase[Miner, MinerCreate, MinerUpdate]):
             raise e
 
 
+class AsyncCRUDMiner(AsyncCRUDBase[Miner, MinerCreate, MinerUpdate]):
+    async def get_miner(self, db: AsyncSession, *, miner_hotkey: str) -> Optional[Miner]:
+        result = await db.execute(select(Miner).where(Miner.miner_hotkey == miner_hotkey))
+        return result.scalars().first()
+
+    async def get_all_miners(self, db: AsyncSession):
+        result = await db.execute(select(Miner))
+        return result.scalars().all()
+
+    async def remove_inactive(self, db: AsyncSession, *, before: int) -> List[str]:
+        """Deletes the miners not updated since `before` together with their history. Does not commit."""
+        miner_hotkeys = (await db.execute(_inactive(before))).scalars().all()
+        if miner_hotkeys:
+            for statement in _remove_inactive_statements(before):
+                await db.execute(statement)
+        return miner_hotkeys
+
+    async def reset_balances(self, db: AsyncSession, *, last_amount: float) -> int:
+        """Restores the balance and clears the trade count and day profit of every miner that traded. Does not commit."""
+        result = await db.execute(_reset_balances_statement(last_amount))
+        return result.rowcount
+
+
 miner = CRUDMiner(Miner)
+async_miner = AsyncCRUDMiner(Miner)
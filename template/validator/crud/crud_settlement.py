@@ -0,0 +1,43 @@
+from template.validator.crud.base import AsyncCRUDBase, CRUDBase
+from template.validator.db.models import Settlement
+from template.validator.settlement import PendingSettlement
+
+from typing import List
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from template.validator.schemas.settlement import SettlementCreate, SettlementUpdate
+
+
+class CRUDSettlement(CRUDBase[Settlement, SettlementCreate, SettlementUpdate]):
+    def get_pending(self, db: Session) -> List[PendingSettlement]:
+        # Plain rows instead of ORM objects, a restart may replay tens of thousands of them
+        rows = db.execute(
+            select(
+                Settlement.miner_hotkey,
+                Settlement.pair,
+                Settlement.exchange_from,
+                Settlement.exchange_to,
+                Settlement.price_from,
+                Settlement.price_to,
+                Settlement.fees_from,
+                Settlement.fees_to,
+                Settlement.amount,
+                Settlement.due_at,
+                Settlement.id,
+            ).order_by(Settlement.due_at)
+        ).all()
+
+        return [PendingSettlement(*row) for row in rows]
+
+    def remove_many(self, db: Session, *, ids: List[int]) -> None:
+        # Deleted in the caller's transaction, together with the settled trades
+        db.execute(delete(Settlement).where(Settlement.id.in_(ids)))
+
+
+class AsyncCRUDSettlement(AsyncCRUDBase[Settlement, SettlementCreate, SettlementUpdate]):
+    pass
+
+
+settlement = CRUDSettlement(Settlement)
+async_settlement = AsyncCRUDSettlement(Settlement)
@@ -1,16 +1,207 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 # Database connection
-DATABASE_URL = "sqlite:///example.db"
+DATABASE_PATH = "example.db"
+
+# Per-connection SQLite settings, see https://www.sqlite.org/pragma.html
+BUSY_TIMEOUT = 5000  # milliseconds
+CACHE_SIZE = 64 * 1024  # KiB
+MMAP_SIZE = 256 * 1024 * 1024  # bytes
+
+
+def create_db_engine(
+    database_path: str = DATABASE_PATH,
+    *,
+    echo: bool = False,
+    busy_timeout: int = BUSY_TIMEOUT,
+    cache_size: int = CACHE_SIZE,
+    mmap_size: int = MMAP_SIZE,
+    pool_size: int = 10,
+    max_overflow: int = 20,
+    pool_timeout: float = 30,
+) -> Engine:
+    """
+    Creates the engine of the validator database.
+
+    Every pooled connection runs in WAL mode with synchronous=NORMAL, so readers never block the writer and a
+    commit does not wait for an fsync, and waits up to `busy_timeout` milliseconds for a lock instead of
+    failing with "database is locked".
+
+    Args:
+        database_path: Path of the SQLite file.
+        echo: Logs every SQL statement when set.
+        busy_timeout: Milliseconds to wait for a lock held by another connection.
+        cache_size: Page cache of each connection in KiB.
+        mmap_size: Bytes of the database file read through memory mapping.
+    """
+    # Each unit of work checks out its own connection, size the pool for the settlement, ledger and request threads.
+    engine = create_engine(
+        f"sqlite:///{database_path}",
+        echo=echo,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+    )
+
+    _set_sqlite_pragmas(engine, busy_timeout, cache_size, mmap_size)
+    return engine
+
+
+def create_async_db_engine(
+    database_path: str = DATABASE_PATH,
+    *,
+    url: Optional[str] = None,
+    echo: bool = False,
+    busy_timeout: int = BUSY_TIMEOUT,
+    cache_size: int = CACHE_SIZE,
+    mmap_size: int = MMAP_SIZE,
+    pool_size: int = 5,
+) -> AsyncEngine:
+    """
+    Creates the engine of the database for the async code paths of the validator.
+
+    Uses aiosqlite on `database_path` with the same pragmas as create_db_engine. `url` overrides it for a
+    database server, like postgresql+asyncpg://..., the sync engine has to point at the same database.
+    """
+    # Sessions are opened from the axon loop and from the main loop. aiosqlite connections are not bound to a
+    # loop, but the pool queue binds to the first loop a checkout waits on, so the overflow is unbounded and
+    # checkouts never wait. Idle connections above `pool_size` are closed when returned.
+    engine = create_async_engine(
+        url or f"sqlite+aiosqlite:///{database_path}",
+        echo=echo,
+        pool_size=pool_size,
+        max_overflow=-1,
+    )
+    if engine.dialect.name == "sqlite":
+        _set_sqlite_pragmas(engine.sync_engine, busy_timeout, cache_size, mmap_size)
+    return engine
 
-engine = create_engine(DATABASE_URL, echo=True)
+
+def _set_sqlite_pragmas(engine: Engine, busy_timeout: int, cache_size: int, mmap_size: int):
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # First, so the other pragmas wait for a lock too.
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        # A negative cache_size is a size in KiB rather than a page count.
+        cursor.execute(f"PRAGMA cache_size=-{int(cache_size)}")
+        cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        cursor.close()
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def init_db(config) -> Engine:
+    """
+    Points the validator at the database configured under `config.neuron.database_*`.
+
+    SessionLocal and AsyncSessionLocal are rebound rather than replaced, so the session factories handed out
+    before, like the one of the miner ledger, use the new engines too.
+    """
+    global engine, async_engine
+
+    options = dict(
+        echo=config.neuron.database_echo,
+        busy_timeout=config.neuron.database_busy_timeout,
+        cache_size=config.neuron.database_cache_size,
+        mmap_size=config.neuron.database_mmap_size,
+    )
+
+    previous = engine
+    engine = create_db_engine(config.neuron.database_path, **options)
+    SessionLocal.configure(bind=engine)
+    previous.dispose()
+
+    # Nothing has run on the async engine yet, init_db is called before the event loops start.
+    async_engine = create_async_db_engine(config.neuron.database_path, **options)
+    AsyncSessionLocal.configure(bind=async_engine)
+    return engine
+
+
 # Dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Session for one unit of work, never shared between threads or requests.
+
+    Commits when the block succeeds and rolls back when it raises, so a failed transaction cannot leak into
+    the next unit of work.
+
+    Example:
+        with session_scope() as db:
+            crud.day.create(db=db, obj_in=...)
+    """
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# One per event loop, an asyncio.Lock cannot be shared between loops.
+_write_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@asynccontextmanager
+async def async_session_scope(write: bool = False) -> AsyncIterator[AsyncSession]:
+    """
+    Async session for one unit of work on the event loop, the counterpart of session_scope().
+
+    Set `write` when the unit of work writes. SQLite has a single writer and transactions waiting for it in
+    the busy handler poll with growing sleeps, so hundreds of concurrent writers starve each other into
+    "database is locked". Writers of one event loop queue on a lock instead and the loop stays free meanwhile.
+
+    Example:
+        async with async_session_scope(write=True) as db:
+            await crud.async_day.create(db=db, obj_in=...)
+    """
+    if not write:
+        async with _session() as db:
+            yield db
+        return
+
+    loop = asyncio.get_running_loop()
+    lock = _write_locks.setdefault(loop, asyncio.Lock())
+    async with lock:
+        async with _session() as db:
+            yield db
+
+
+@asynccontextmanager
+async def _session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
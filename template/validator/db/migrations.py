@@ -0,0 +1,132 @@
+from typing import Callable, Dict, List
+
+import bittensor as bt
+from sqlalchemy import Table
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+import template.validator.db.models as models
+from template.validator.db.base_class import Base
+
+
+def _epoch(column: str) -> str:
+    # The strings were written by datetime.now(), the 'utc' modifier reads them as local time.
+    return (
+        f"CASE WHEN typeof({column}) IN ('integer', 'real') THEN CAST({column} AS INTEGER) "
+        f"ELSE CAST(strftime('%s', {column}, 'utc') AS INTEGER) END"
+    )
+
+
+def _rebuild(cursor, table: Table, expressions: Dict[str, str]):
+    """
+    Recreates `table` with the DDL and indexes of its model, copying every row.
+
+    Columns listed in `expressions` are filled with the SQL expression instead of the old value.
+    """
+    dialect = sqlite.dialect()
+    old = f"{table.name}_old"
+
+    # Index names are global, the ones of the old table would clash with the new table.
+    indexes = cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table.name,),
+    ).fetchall()
+    for (index,) in indexes:
+        cursor.execute(f'DROP INDEX "{index}"')
+
+    cursor.execute(f'ALTER TABLE "{table.name}" RENAME TO "{old}"')
+    cursor.execute(str(CreateTable(table).compile(dialect=dialect)))
+    for index in table.indexes:
+        cursor.execute(str(CreateIndex(index).compile(dialect=dialect)))
+
+    # Columns added by later versions are left to their server default.
+    existing = {row[1] for row in cursor.execute(f'PRAGMA table_info("{old}")').fetchall()}
+    columns = [column.name for column in table.columns if column.name in existing]
+    cursor.execute(
+        f'INSERT INTO "{table.name}" ({", ".join(columns)}) '
+        f'SELECT {", ".join(expressions.get(column, column) for column in columns)} FROM "{old}"'
+    )
+    cursor.execute(f'DROP TABLE "{old}"')
+
+
+def _integer_timestamps(cursor):
+    """Version 1: epoch-integer timestamps and (miner_hotkey, timestamp) indexes."""
+    # Keeps the foreign keys of the other tables pointing at "miner" while it is renamed.
+    cursor.execute("PRAGMA legacy_alter_table=ON")
+    _rebuild(cursor, models.Miner.__table__, {"last_updated": _epoch("last_updated")})
+    _rebuild(cursor, models.Arbitrage.__table__, {"timestamp": _epoch("timestamp")})
+    _rebuild(cursor, models.Day.__table__, {"timestamp": _epoch("timestamp")})
+    cursor.execute("PRAGMA legacy_alter_table=OFF")
+
+
+def _day_profit(cursor):
+    """Version 2: running day profit of each miner."""
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(miner)").fetchall()}
+    if "day_profit" not in columns:
+        cursor.execute("ALTER TABLE miner ADD COLUMN day_profit FLOAT NOT NULL DEFAULT 0")
+
+    # Start from the trades settled since each miner's last day row.
+    cursor.execute(
+        """
+        UPDATE miner SET day_profit = COALESCE((
+            SELECT SUM(arbitrage.amount * arbitrage.profit) FROM arbitrage
+            WHERE arbitrage.miner_hotkey = miner.miner_hotkey
+            AND arbitrage.timestamp > COALESCE(
+                (SELECT MAX(day.timestamp) FROM day WHERE day.miner_hotkey = miner.miner_hotkey), 0
+            )
+        ), 0)
+        WHERE transaction_count > 0
+        """
+    )
+
+
+# Applied in order, a database at user_version N runs MIGRATIONS[N:].
+MIGRATIONS: List[Callable] = [_integer_timestamps, _day_profit]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(engine: Engine) -> int:
+    """
+    Brings the database to the current schema and creates the missing tables.
+
+    The schema version is kept in PRAGMA user_version. Pending migrations run in one transaction, so a failed
+    migration leaves the database as it was.
+
+    Returns:
+        The version the database was at.
+    """
+    raw = engine.raw_connection()
+    try:
+        connection = raw.driver_connection
+        isolation_level = connection.isolation_level
+        # Manage the transaction by hand, the sqlite3 module only opens one before DML statements.
+        connection.isolation_level = None
+        cursor = connection.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            existing = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'miner'"
+            ).fetchone()
+
+            # A new database gets the current schema from create_all.
+            if existing:
+                for step in MIGRATIONS[version:]:
+                    bt.logging.info(f"Migrating the database: {step.__doc__}")
+                    step(cursor)
+
+            cursor.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            cursor.execute("COMMIT")
+        except Exception:
+            if connection.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
+            connection.isolation_level = isolation_level
+    finally:
+        raw.close()
+
+    Base.metadata.create_all(bind=engine)
+    return version
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from template.validator.db.base_class import Base
 
@@ -7,9 +7,12 @@ class Miner(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     miner_hotkey = Column(String(256), nullable=False, unique=True)
-    last_updated = Column(String(256), nullable=False)
+    # Unix seconds.
+    last_updated = Column(Integer, nullable=False)
     last_amount = Column(Float, nullable=False)
     transaction_count = Column(Integer, nullable=False)
+    # Sum of amount * profit of the trades settled since the last day row.
+    day_profit = Column(Float, nullable=False, default=0.0, server_default="0")
     arbitrages = relationship("Arbitrage", back_populates="miner", cascade="all, delete-orphan")
     days = relationship("Day", back_populates="miner", cascade="all, delete-orphan")
 
@@ -26,15 +29,37 @@ class Arbitrage(Base):
     fees_from = Column(Float, nullable=False)
     fees_to = Column(Float, nullable=False)
     amount = Column(Float, nullable=False)
-    timestamp = Column(String, nullable=False)
+    # Unix seconds.
+    timestamp = Column(Integer, nullable=False)
     profit = Column(Float, nullable=False)
     miner = relationship("Miner", back_populates="arbitrages")
 
+    # Per-miner history queries filter on the hotkey and sort on the timestamp.
+    __table_args__ = (Index("ix_arbitrage_miner_hotkey_timestamp", "miner_hotkey", "timestamp"),)
+
 class Day(Base):
     __tablename__ = "day"
 
     id = Column(Integer, primary_key=True, index=True)
     miner_hotkey = Column(String(256), ForeignKey("miner.miner_hotkey"), nullable=False)
     total_profit = Column(Float, nullable=False)
-    timestamp = Column(String, nullable=False)
-    miner = relationship("Miner", back_populates="days")
\ No newline at end of file
+    # Unix seconds.
+    timestamp = Column(Integer, nullable=False)
+    miner = relationship("Miner", back_populates="days")
+
+    __table_args__ = (Index("ix_day_miner_hotkey_timestamp", "miner_hotkey", "timestamp"),)
+
+class Settlement(Base):
+    __tablename__ = "settlement"
+
+    id = Column(Integer, primary_key=True, index=True)
+    miner_hotkey = Column(String(256), nullable=False)
+    pair = Column(String, nullable=False)
+    exchange_from = Column(String, nullable=False)
+    exchange_to = Column(String, nullable=False)
+    price_from = Column(Float, nullable=False)
+    price_to = Column(Float, nullable=False)
+    fees_from = Column(Float, nullable=False)
+    fees_to = Column(Float, nullable=False)
+    amount = Column(Float, nullable=False)
+    due_at = Column(Float, nullable=False, index=True)
@@ -0,0 +1,139 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+import ccxt
+import bittensor as bt
+
+
+class ExchangeRegistry:
+    """
+    Process-wide pool of warm ccxt exchange instances.
+
+    Each exchange is created once and its markets are loaded once; every request after that is handed the
+    same instance. A background thread reloads the markets of every pooled exchange each `refresh_interval`
+    seconds so listings and precision data do not go stale.
+    """
+
+    def __init__(self, refresh_interval: float = 3600):
+        self.refresh_interval = refresh_interval
+        self.hits = 0
+        self.misses = 0
+        # Duration in seconds of the last market load for each exchange.
+        self.refresh_durations: Dict[str, float] = {}
+        self.last_refresh: Optional[float] = None
+
+        self._exchanges: Dict[str, ccxt.Exchange] = {}
+        self._create_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, exchange_id: str) -> ccxt.Exchange:
+        """
+        Returns the warm instance for `exchange_id`, creating it and loading its markets on first use.
+
+        Raises:
+            ValueError: If ccxt does not know the exchange.
+        """
+        exchange = self._exchanges.get(exchange_id)
+        if exchange is not None:
+            self._count(hit=True)
+            return exchange
+
+        if exchange_id not in ccxt.exchanges:
+            raise ValueError(f"Unknown exchange: {exchange_id}")
+
+        # Only one thread builds a given exchange; the others wait for it and reuse the result.
+        with self._lock:
+            create_lock = self._create_locks.setdefault(exchange_id, threading.Lock())
+        with create_lock:
+            exchange = self._exchanges.get(exchange_id)
+            if exchange is not None:
+                self._count(hit=True)
+                return exchange
+
+            self._count(hit=False)
+            exchange = getattr(ccxt, exchange_id)({"enableRateLimit": True})
+            self._load_markets(exchange_id, exchange)
+            self._exchanges[exchange_id] = exchange
+
+        return exchange
+
+    def warm(self, exchange_ids: Iterable[str], max_workers: int = 8):
+        """Creates the given exchanges and loads their markets concurrently."""
+        exchange_ids = list(exchange_ids)
+        if not exchange_ids:
+            return
+
+        def _warm(exchange_id):
+            try:
+                self.get(exchange_id)
+            except Exception as e:
+                bt.logging.warning(f"Could not warm exchange {exchange_id}: {e}")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_warm, exchange_ids))
+
+        bt.logging.info(f"Exchange registry warmed: {self.stats()}")
+
+    def start(self, exchange_ids: Iterable[str] = ()):
+        """Warms the given exchanges and starts the background market refresh thread."""
+        self.warm(exchange_ids)
+
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._refresh_loop, name="exchange-registry", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stops the background market refresh thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def refresh(self):
+        """Reloads the markets of every pooled exchange."""
+        for exchange_id, exchange in list(self._exchanges.items()):
+            try:
+                self._load_markets(exchange_id, exchange, reload=True)
+            except Exception as e:
+                # Keep serving the previously loaded markets.
+                bt.logging.warning(f"Failed to refresh markets for {exchange_id}: {e}")
+
+        self.last_refresh = time.time()
+
+    def stats(self) -> Dict:
+        """Returns the registry counters for monitoring."""
+        return {
+            "exchanges": len(self._exchanges),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refresh_durations": dict(self.refresh_durations),
+            "last_refresh": self.last_refresh,
+        }
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+            bt.logging.debug(f"Exchange registry refreshed: {self.stats()}")
+
+    def _load_markets(self, exchange_id: str, exchange: ccxt.Exchange, reload: bool = False):
+        start = time.perf_counter()
+        exchange.load_markets(reload=reload)
+        self.refresh_durations[exchange_id] = time.perf_counter() - start
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+# Shared by every request handled in this process.
+exchange_registry = ExchangeRegistry()
@@ -0,0 +1,85 @@
+import time
+import threading
+from typing import Dict
+
+import bittensor as bt
+
+from template.validator.exchanges import ExchangeRegistry, exchange_registry
+
+DEFAULT_FEE = 0.002
+
+# Wait this long before retrying an exchange whose fee endpoint failed.
+RETRY_INTERVAL = 60
+
+
+class FeeTable:
+    """
+    Maker fees per exchange, loaded with one `fetch_trading_fees` call and kept as a compact {symbol: fee} dict.
+
+    A table older than `refresh_interval` seconds is reloaded by the first caller that notices; concurrent
+    callers keep reading the previous table meanwhile. Exchanges without a fee endpoint use `DEFAULT_FEE`.
+    """
+
+    def __init__(self, registry: ExchangeRegistry, refresh_interval: float = 6 * 3600):
+        self.registry = registry
+        self.refresh_interval = refresh_interval
+
+        self._tables: Dict[str, Dict[str, float]] = {}
+        self._expires_at: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, exchange_id: str, symbol: str) -> float:
+        """Returns the maker fee of `symbol` on `exchange_id`. Blocking on the first lookup of an exchange."""
+        exchange = self.registry.get(exchange_id)
+        if not exchange.has.get("fetchTradingFees"):
+            return DEFAULT_FEE
+
+        table = self._tables.get(exchange_id)
+        if table is None or time.monotonic() >= self._expires_at[exchange_id]:
+            table = self._refresh(exchange_id, wait=table is None)
+
+        fee = table.get(symbol)
+        if fee is None:
+            # Symbol missing from the endpoint, use the static fee ccxt ships with the market.
+            market = exchange.markets.get(symbol) if exchange.markets else None
+            fee = market.get("maker") if market else None
+
+        return DEFAULT_FEE if fee is None else fee
+
+    def _refresh(self, exchange_id: str, wait: bool) -> Dict[str, float]:
+        with self._lock:
+            lock = self._locks.setdefault(exchange_id, threading.Lock())
+
+        # Only the first loader of an exchange makes the others wait; later refreshes serve the old table.
+        if not lock.acquire(blocking=wait):
+            return self._tables[exchange_id]
+
+        try:
+            table = self._tables.get(exchange_id)
+            if table is not None and time.monotonic() < self._expires_at[exchange_id]:
+                return table
+
+            try:
+                trading_fees = self.registry.get(exchange_id).fetch_trading_fees()
+            except Exception as e:
+                if table is None:
+                    raise
+                bt.logging.warning(f"Failed to refresh fees for {exchange_id}: {e}")
+                self._expires_at[exchange_id] = time.monotonic() + RETRY_INTERVAL
+                return table
+
+            table = {
+                symbol: fees["maker"]
+                for symbol, fees in trading_fees.items()
+                if fees.get("maker") is not None
+            }
+            self._tables[exchange_id] = table
+            self._expires_at[exchange_id] = time.monotonic() + self.refresh_interval
+            return table
+        finally:
+            lock.release()
+
+
+# Shared by every request handled in this process.
+fee_table = FeeTable(exchange_registry)
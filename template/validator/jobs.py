@@ -0,0 +1,123 @@
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import bittensor as bt
+
+RETRY_INTERVAL = 60
+
+
+class Job:
+    """A coroutine function run on a calendar aligned to UTC midnight."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable],
+        interval: float,
+        offset: float,
+        last_run: Optional[float],
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.offset = offset
+        # Slot of the last successful run, unix seconds.
+        self.last_run = last_run
+        self.retry_at = 0.0
+
+    def slot(self, now: float) -> float:
+        """Latest scheduled time at or before `now`."""
+        return (now - self.offset) // self.interval * self.interval + self.offset
+
+
+class JobScheduler:
+    """
+    Cron-like scheduler for the periodic validator work, like the daily rollup and the scoring pass.
+
+    Runs are aligned to UTC midnight: a job with `interval` one day and `offset` zero is due at every 00:00
+    UTC, one with `interval` six hours at 00:00, 06:00, 12:00 and 18:00. Nothing runs in the background,
+    the validator calls run_pending() from its main loop, between its block checks and metagraph syncs.
+
+    The slot of the last successful run of each job is saved in `state_path`. After downtime the missed slots
+    are caught up with a single run, the work of a slot covers everything since the previous run.
+    """
+
+    def __init__(self, state_path: Optional[str] = None):
+        self.state_path = state_path
+        self.jobs: Dict[str, Job] = {}
+        self._state = self._load_state()
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Awaitable],
+        interval: float = 86400,
+        offset: float = 0,
+    ) -> Job:
+        """
+        Schedules `func` every `interval` seconds, `offset` seconds after the UTC midnight aligned slots.
+
+        A job without a saved last run waits for its next slot instead of running at startup.
+        """
+        if interval <= 0:
+            raise ValueError(f"Invalid interval {interval} for job {name}")
+
+        last_run = self._state.get(name)
+        job = Job(name, func, interval, offset % interval, last_run)
+        if last_run is None:
+            job.last_run = job.slot(time.time())
+        self.jobs[name] = job
+        return job
+
+    async def run_pending(self, now: Optional[float] = None) -> List[str]:
+        """Runs every job whose slot has come, in the order they were added. Returns their names."""
+        now = time.time() if now is None else now
+        ran = []
+
+        for job in self.jobs.values():
+            slot = job.slot(now)
+            if job.last_run >= slot or now < job.retry_at:
+                continue
+
+            missed = int((slot - job.last_run) // job.interval)
+            if missed > 1:
+                bt.logging.info(f"Catching up {missed} missed runs of {job.name}")
+
+            start = time.perf_counter()
+            try:
+                await job.func()
+            except Exception as e:
+                job.retry_at = now + RETRY_INTERVAL
+                bt.logging.error(f"Job {job.name} failed, retrying in {RETRY_INTERVAL}s: {e}")
+                continue
+
+            job.last_run = slot
+            ran.append(job.name)
+            bt.logging.info(f"Job {job.name} ran in {time.perf_counter() - start:.3f}s")
+            self._save_state()
+
+        return ran
+
+    def _load_state(self) -> Dict[str, float]:
+        if self.state_path is None or not os.path.exists(self.state_path):
+            return {}
+
+        try:
+            with open(self.state_path) as f:
+                return {name: float(last_run) for name, last_run in json.load(f).items()}
+        except (OSError, ValueError, AttributeError) as e:
+            bt.logging.warning(f"Ignoring unreadable job state {self.state_path}: {e}")
+            return {}
+
+    def _save_state(self):
+        if self.state_path is None:
+            return
+
+        self._state.update({name: job.last_run for name, job in self.jobs.items()})
+        # Write and rename, a crash cannot leave a truncated file behind.
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._state, f)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,304 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import bittensor as bt
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+import template.validator.db.models as models
+
+
+class LedgerEntry:
+    """Balance, trade count and running day profit of one miner."""
+
+    __slots__ = (
+        "miner_hotkey",
+        "last_amount",
+        "transaction_count",
+        "last_updated",
+        "day_profit",
+        "persisted",
+        "dirty",
+    )
+
+    def __init__(
+        self,
+        miner_hotkey: str,
+        last_amount: float,
+        transaction_count: int,
+        last_updated: float,
+        persisted: bool,
+        day_profit: float = 0.0,
+    ):
+        self.miner_hotkey = miner_hotkey
+        self.last_amount = last_amount
+        self.transaction_count = transaction_count
+        # Unix seconds.
+        self.last_updated = last_updated
+        # Sum of amount * profit of the trades settled since the last rollup.
+        self.day_profit = day_profit
+        # Whether the miner table already has a row for this entry.
+        self.persisted = persisted
+        self.dirty = False
+
+
+class MinerLedger:
+    """
+    In-memory ledger of miner balances, the source of truth while the validator runs.
+
+    Every read is served from memory and every balance change is applied atomically under one lock. Changed
+    entries are flushed to the `miner` table in one batched transaction every `flush_interval` seconds and
+    when the ledger stops, so a crash loses at most one interval of balance updates.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], flush_interval: float = 30):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+
+        self._entries: Dict[str, LedgerEntry] = {}
+        self._removed: Set[str] = set()
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, miner_hotkey: str) -> bool:
+        return miner_hotkey in self._entries
+
+    @contextmanager
+    def locked(self):
+        """Holds off every balance change, for work that needs the ledger and the database to agree."""
+        with self._lock:
+            yield
+
+    def load(self):
+        """Replaces the ledger with the contents of the miner table."""
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(
+                    models.Miner.miner_hotkey,
+                    models.Miner.last_amount,
+                    models.Miner.transaction_count,
+                    models.Miner.last_updated,
+                    models.Miner.day_profit,
+                )
+            ).all()
+
+        with self._lock:
+            self._entries = {
+                miner_hotkey: LedgerEntry(
+                    miner_hotkey,
+                    last_amount,
+                    transaction_count,
+                    float(last_updated),
+                    persisted=True,
+                    day_profit=day_profit,
+                )
+                for miner_hotkey, last_amount, transaction_count, last_updated, day_profit in rows
+            }
+            self._removed.clear()
+
+        bt.logging.info(f"Loaded {len(rows)} miners into the ledger")
+
+    def get(self, miner_hotkey: str) -> Optional[Tuple[float, int, float]]:
+        """Returns (last_amount, transaction_count, last_updated) of a miner, or None if it is unknown."""
+        entry = self._entries.get(miner_hotkey)
+        if entry is None:
+            return None
+        return entry.last_amount, entry.transaction_count, entry.last_updated
+
+    def day_profit(self, miner_hotkey: str) -> Optional[float]:
+        """Returns the profit a miner made since the last rollup, or None if it is unknown."""
+        entry = self._entries.get(miner_hotkey)
+        if entry is None:
+            return None
+        return entry.day_profit
+
+    def hotkeys(self) -> List[str]:
+        return list(self._entries)
+
+    def entries(self) -> List[Tuple[str, float, int, float]]:
+        """Returns a consistent snapshot of (miner_hotkey, last_amount, transaction_count, last_updated)."""
+        with self._lock:
+            return [
+                (e.miner_hotkey, e.last_amount, e.transaction_count, e.last_updated)
+                for e in self._entries.values()
+            ]
+
+    def create(self, miner_hotkey: str, last_amount: float) -> bool:
+        """Adds a miner with `last_amount`. Returns False if it already exists."""
+        with self._lock:
+            if miner_hotkey in self._entries:
+                return False
+            entry = LedgerEntry(miner_hotkey, last_amount, 0, time.time(), persisted=False)
+            entry.dirty = True
+            self._entries[miner_hotkey] = entry
+            return True
+
+    def debit(self, miner_hotkey: str, fraction: float, fees: float) -> Optional[Tuple[float, float]]:
+        """
+        Spends `fraction` of a miner's balance on a buy paying `fees`.
+
+        Returns:
+            (last_amount, amount_for_buying) with the balance before the buy, or None if the miner is unknown
+            or has nothing left to trade.
+        """
+        with self._lock:
+            entry = self._entries.get(miner_hotkey)
+            if entry is None or entry.last_amount <= 0:
+                return None
+
+            last_amount = entry.last_amount
+            amount_for_buying = last_amount * fraction
+            entry.last_amount = last_amount - amount_for_buying * (1 + fees)
+            entry.last_updated = time.time()
+            entry.dirty = True
+            return last_amount, amount_for_buying
+
+    def credit(
+        self, miner_hotkey: str, amount: float, transactions: int = 1, profit: float = 0.0
+    ) -> bool:
+        """
+        Adds the proceeds of settled trades to a miner's balance and their `profit` to its day profit.
+
+        Returns False if the miner is unknown.
+        """
+        with self._lock:
+            entry = self._entries.get(miner_hotkey)
+            if entry is None:
+                return False
+
+            entry.last_amount += amount
+            entry.transaction_count += transactions
+            entry.day_profit += profit
+            entry.last_updated = time.time()
+            entry.dirty = True
+            return True
+
+    def reset(self, miner_hotkey: str, last_amount: float):
+        """Starts a new day for a miner: restores its balance and clears its trade count and day profit."""
+        with self._lock:
+            entry = self._entries.get(miner_hotkey)
+            if entry is None:
+                return
+
+            entry.last_amount = last_amount
+            entry.transaction_count = 0
+            entry.day_profit = 0.0
+            entry.dirty = True
+
+    def remove(self, miner_hotkey: str):
+        """Forgets a miner; its row and history are deleted at the next flush."""
+        with self._lock:
+            # Also when the entry was never flushed, a flush in progress may be inserting it.
+            if self._entries.pop(miner_hotkey, None) is not None:
+                self._removed.add(miner_hotkey)
+
+    def flush(self):
+        """Writes every changed entry to the database in one transaction."""
+        with self._lock:
+            removed = list(self._removed)
+            self._removed.clear()
+            changed = [entry for entry in self._entries.values() if entry.dirty]
+            rows = [
+                {
+                    "b_miner_hotkey": entry.miner_hotkey,
+                    "b_last_amount": entry.last_amount,
+                    "b_transaction_count": entry.transaction_count,
+                    "b_last_updated": int(entry.last_updated),
+                    "b_day_profit": entry.day_profit,
+                }
+                for entry in changed
+            ]
+            persisted = [entry.persisted for entry in changed]
+            for entry in changed:
+                entry.dirty = False
+
+        if not removed and not rows:
+            return
+
+        new_rows = [row for row, known in zip(rows, persisted) if not known]
+        existing_rows = [row for row, known in zip(rows, persisted) if known]
+
+        start = time.perf_counter()
+        try:
+            with self.session_factory() as db:
+                self._write(db, removed, new_rows, existing_rows)
+                db.commit()
+        except Exception:
+            # Keep the changes pending, an entry touched since the snapshot is already dirty again.
+            with self._lock:
+                self._removed.update(removed)
+                for entry in changed:
+                    if self._entries.get(entry.miner_hotkey) is entry:
+                        entry.dirty = True
+            raise
+
+        with self._lock:
+            for entry in changed:
+                entry.persisted = True
+
+        bt.logging.debug(
+            f"Flushed {len(rows)} miners and removed {len(removed)} in {time.perf_counter() - start:.3f}s"
+        )
+
+    def start(self):
+        """Starts flushing changed entries every `flush_interval` seconds."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name="miner-ledger", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the flush thread and writes the remaining changes."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+        self.flush()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                bt.logging.error(f"Failed to flush the miner ledger: {e}")
+
+    @staticmethod
+    def _write(db: Session, removed: List[str], new_rows: List[Dict], existing_rows: List[Dict]):
+        if removed:
+            # Bulk deletes skip the ORM cascade, remove the history explicitly.
+            for model in (models.Arbitrage, models.Day, models.Miner):
+                db.execute(delete(model).where(model.miner_hotkey.in_(removed)))
+
+        miner = models.Miner.__table__
+        if new_rows:
+            db.execute(
+                insert(miner).values(
+                    miner_hotkey=bindparam("b_miner_hotkey"),
+                    last_amount=bindparam("b_last_amount"),
+                    transaction_count=bindparam("b_transaction_count"),
+                    last_updated=bindparam("b_last_updated"),
+                    day_profit=bindparam("b_day_profit"),
+                ),
+                new_rows,
+            )
+
+        if existing_rows:
+            db.execute(
+                update(miner)
+                .where(miner.c.miner_hotkey == bindparam("b_miner_hotkey"))
+                .values(
+                    last_amount=bindparam("b_last_amount"),
+                    transaction_count=bindparam("b_transaction_count"),
+                    last_updated=bindparam("b_last_updated"),
+                    day_profit=bindparam("b_day_profit"),
+                ),
+                existing_rows,
+            )
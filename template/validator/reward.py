@@ -17,8 +17,12 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 import numpy as np
-from typing import List
+from typing import List, Tuple
 import bittensor as bt
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import template.validator.db.models as models
 
 
 def reward(query: int, response: int) -> float:
@@ -53,3 +57,65 @@ def get_rewards(
     return np.array(
         [reward(query, response) for response in responses]
     )
+
+
+def weighted_profits(
+    db: Session, miner_hotkeys: List[str], days: int = 7
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Linearly decaying average of the last `days` daily profits of each miner.
+
+    Of a miner with n days of history the latest day weighs n and the oldest weighs 1. Every history is read
+    with one windowed query and the averages are computed on a (miners, days) array.
+
+    Args:
+    - db (Session): The database session.
+    - miner_hotkeys (List[str]): The miners to score.
+    - days (int): How many of the latest days are averaged.
+
+    Returns:
+    - Tuple[np.ndarray, np.ndarray]: The averages, aligned with `miner_hotkeys`, and a mask of the miners that
+      have any history. Miners without history average 0.
+    """
+    index = {miner_hotkey: i for i, miner_hotkey in enumerate(miner_hotkeys)}
+    profits = np.zeros((len(miner_hotkeys), days))
+    counts = np.zeros(len(miner_hotkeys), dtype=int)
+
+    if miner_hotkeys:
+        ranked = (
+            select(
+                models.Day.miner_hotkey,
+                models.Day.total_profit,
+                func.row_number()
+                .over(
+                    partition_by=models.Day.miner_hotkey,
+                    order_by=(models.Day.timestamp.desc(), models.Day.id.desc()),
+                )
+                .label("rank"),
+            )
+            .where(models.Day.miner_hotkey.in_(miner_hotkeys))
+            .subquery()
+        )
+        rows = db.execute(
+            select(ranked.c.miner_hotkey, ranked.c.total_profit, ranked.c.rank).where(
+                ranked.c.rank <= days
+            )
+        ).all()
+
+        if rows:
+            hotkeys, total_profits, ranks = zip(*rows)
+            miners = np.fromiter((index[hotkey] for hotkey in hotkeys), dtype=int, count=len(rows))
+            # Rank 1 is the latest day.
+            profits[miners, np.asarray(ranks) - 1] = total_profits
+            np.add.at(counts, miners, 1)
+
+    # weights[i, r] = n_i - r for the n_i days of miner i, 0 past its history.
+    weights = np.clip(counts[:, None] - np.arange(days), 0, None)
+    total_weights = weights.sum(axis=1)
+    averages = np.divide(
+        (profits * weights).sum(axis=1),
+        total_weights,
+        out=np.zeros(len(miner_hotkeys)),
+        where=total_weights > 0,
+    )
+    return averages, counts > 0
@@ -1,3 +1,4 @@
 from .miner import Miner, MinerCreate, MinerUpdate, MinerInDBBase, MinerInDB
 from .arbitrage import Arbitrage, ArbitrageCreate, ArbitrageUpdate, ArbitrageInDBBase, ArbitrageInDB
-from .day import Day, DayCreate, DayUpdate, DayInDBBase, DayInDB
\ No newline at end of file
+from .day import Day, DayCreate, DayUpdate, DayInDBBase, DayInDB
+from .settlement import Settlement, SettlementCreate, SettlementUpdate, SettlementInDBBase, SettlementInDB
\ No newline at end of file
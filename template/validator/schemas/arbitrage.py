@@ -12,7 +12,7 @@ class ArbitrageBase(BaseModel):
     fees_from: float
     fees_to: float
     amount: float
-    timestamp: str
+    timestamp: int
     profit: float
 
 
@@ -26,7 +26,7 @@ class ArbitrageCreate(ArbitrageBase):
     fees_from: float
     fees_to: float
     amount: float
-    timestamp: str
+    timestamp: int
     profit: float
 
 
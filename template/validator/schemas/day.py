@@ -5,13 +5,13 @@ from typing import Optional
 class DayBase(BaseModel):
     miner_hotkey: str
     total_profit: float
-    timestamp: str
+    timestamp: int
 
 
 class DayCreate(DayBase):
     miner_hotkey: str
     total_profit: float
-    timestamp: str
+    timestamp: int
 
 
 class DayUpdate(DayBase):
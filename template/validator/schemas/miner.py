@@ -4,21 +4,22 @@ from typing import Optional
 
 class MinerBase(BaseModel):
     miner_hotkey: str
-    last_updated: str
+    last_updated: int
     last_amount: float
     transaction_count: int
-    
+    day_profit: float = 0.0
+
 
 
 class MinerCreate(MinerBase):
     miner_hotkey: str
-    last_updated: str
+    last_updated: int
     last_amount: float
     transaction_count: int
 
 
 class MinerUpdate(MinerBase):
-    last_updated: str
+    last_updated: int
     last_amount: float
     transaction_count: int
 
@@ -0,0 +1,47 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class SettlementBase(BaseModel):
+    miner_hotkey: str
+    pair: str
+    exchange_from: str
+    exchange_to: str
+    price_from: float
+    price_to: float
+    fees_from: float
+    fees_to: float
+    amount: float
+    due_at: float
+
+
+class SettlementCreate(SettlementBase):
+    pass
+
+
+class SettlementUpdate(SettlementBase):
+    pass
+
+
+# Properties shared by models stored in DB
+
+
+class SettlementInDBBase(SettlementBase):
+    id: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+
+
+class Settlement(SettlementInDBBase):
+    pass
+
+
+# Properties properties stored in DB
+
+
+class SettlementInDB(SettlementInDBBase):
+    pass
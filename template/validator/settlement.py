@@ -0,0 +1,173 @@
+import time
+import heapq
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import bittensor as bt
+
+
+class PendingSettlement:
+    """The sell leg of a simulated arbitrage, completed once `due_at` (unix seconds) has passed."""
+
+    __slots__ = (
+        "miner_hotkey",
+        "pair",
+        "exchange_from",
+        "exchange_to",
+        "price_from",
+        "price_to",
+        "fees_from",
+        "fees_to",
+        "amount",
+        "due_at",
+        "id",
+    )
+
+    def __init__(
+        self,
+        miner_hotkey: str,
+        pair: str,
+        exchange_from: str,
+        exchange_to: str,
+        price_from: float,
+        price_to: float,
+        fees_from: float,
+        fees_to: float,
+        amount: float,
+        due_at: float,
+        id: Optional[int] = None,
+    ):
+        self.miner_hotkey = miner_hotkey
+        self.pair = pair
+        self.exchange_from = exchange_from
+        self.exchange_to = exchange_to
+        self.price_from = price_from
+        self.price_to = price_to
+        self.fees_from = fees_from
+        self.fees_to = fees_to
+        self.amount = amount
+        self.due_at = due_at
+        # Primary key of the row persisting this settlement.
+        self.id = id
+
+    @property
+    def profit(self) -> float:
+        """Relative profit of the round trip after both fees."""
+        return (1 - self.fees_from) * self.price_to * (1 - self.fees_to) / self.price_from - 1
+
+    @property
+    def proceeds(self) -> float:
+        """Amount credited back to the miner when the sell leg completes."""
+        return self.amount * (1 - self.fees_from) * self.price_to * (1 - self.fees_to) / self.price_from
+
+
+class SettlementScheduler:
+    """
+    Timer heap of pending sell legs.
+
+    `schedule` only pushes onto the heap, so it never blocks the caller. A single timer thread sleeps until
+    the earliest settlement is due and hands the due settlements, in batches of up to `batch_size`, to a
+    fixed pool of `workers` threads that call `settle`. Thousands of in-flight trades therefore cost heap
+    entries, not threads, and a backlog of overdue trades is settled a batch per transaction.
+    """
+
+    def __init__(
+        self,
+        settle: Callable[[List[PendingSettlement]], None],
+        workers: int = 1,
+        batch_size: int = 500,
+    ):
+        self.settle = settle
+        self.workers = workers
+        self.batch_size = batch_size
+        self.settled = 0
+        self.failed = 0
+
+        self._heap: List[Tuple[float, int, PendingSettlement]] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, settlement: PendingSettlement):
+        with self._cond:
+            heapq.heappush(self._heap, (settlement.due_at, next(self._counter), settlement))
+            # Wake the timer in case this settlement is due before the one it is sleeping on.
+            if self._heap[0][2] is settlement:
+                self._cond.notify()
+
+    def load(self, settlements: List[PendingSettlement]):
+        """Adds many settlements at once, e.g. the ones persisted before a restart."""
+        with self._cond:
+            self._heap.extend(
+                (settlement.due_at, next(self._counter), settlement)
+                for settlement in settlements
+            )
+            heapq.heapify(self._heap)
+            self._cond.notify()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="settlement"
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="settlement-timer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stops the timer and waits for settlements already handed to the workers."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._heap:
+                        delay = self._heap[0][0] - time.time()
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+
+                if self._stopping:
+                    return
+
+                due = []
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[2])
+
+            for i in range(0, len(due), self.batch_size):
+                self._executor.submit(self._settle, due[i : i + self.batch_size])
+
+    def _settle(self, batch: List[PendingSettlement]):
+        try:
+            self.settle(batch)
+            with self._cond:
+                self.settled += len(batch)
+        except Exception as e:
+            with self._cond:
+                self.failed += len(batch)
+            # Persisted settlements stay in the database and are replayed at the next start.
+            bt.logging.error(f"Error settling {len(batch)} sell legs: {e}")
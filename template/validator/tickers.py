@@ -0,0 +1,92 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class TickerCache:
+    """
+    Short-lived cache of exchange tickers keyed by (exchange, symbol).
+
+    A cached ticker is served while it is younger than `max_age` seconds. Lookups of the same key that miss
+    at the same time are coalesced: only the first one calls upstream and the others await its result, so
+    N concurrent synapses for a hot pair cost a single `fetch_ticker`. Failed fetches are not cached.
+    """
+
+    def __init__(self, max_age: float = 3.0, max_entries: int = 10000):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._served_age_total = 0.0
+        self._served_age_max = 0.0
+
+    async def get(
+        self,
+        exchange_id: str,
+        symbol: str,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Returns the ticker for (exchange_id, symbol), calling `fetch` only when no fresh copy exists."""
+        key = (exchange_id, symbol)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None and now - entry[0] <= self.max_age:
+            age = now - entry[0]
+            self.hits += 1
+            self._served_age_total += age
+            self._served_age_max = max(self._served_age_max, age)
+            return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # The fetch runs as its own task so a waiter that times out does not cancel it for the others.
+            inflight = asyncio.ensure_future(self._fetch(key, fetch))
+            # Retrieve the error even if every waiter gave up, it was already reported to them.
+            inflight.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._inflight[key] = inflight
+
+        return await asyncio.shield(inflight)
+
+    def stats(self) -> Dict[str, float]:
+        """Returns hit-rate and age metrics for tuning `max_age`."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "mean_age": self._served_age_total / self.hits if self.hits else 0.0,
+            "max_age": self._served_age_max,
+        }
+
+    def clear(self):
+        self._entries.clear()
+
+    async def _fetch(self, key: Tuple[str, str], fetch: Callable[[], Awaitable[Any]]):
+        try:
+            ticker = await fetch()
+            if len(self._entries) >= self.max_entries:
+                self._prune()
+            self._entries[key] = (time.monotonic(), ticker)
+            return ticker
+        finally:
+            self._inflight.pop(key, None)
+
+    def _prune(self):
+        now = time.monotonic()
+        for key, (fetched_at, _) in list(self._entries.items()):
+            if now - fetched_at > self.max_age:
+                del self._entries[key]
+
+
+# Shared by every synapse handled on the axon event loop.
+ticker_cache = TickerCache()
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import template.validator.db.models as models
+from template.validator import crud
+from template.validator.database import create_async_db_engine, create_db_engine
+from template.validator.db.models import Base
+from template.validator.schemas import SettlementCreate
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    path = str(tmp_path / "async.db")
+    engine = create_db_engine(path)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    async_engine = create_async_db_engine(path)
+    yield async_sessionmaker(async_engine, expire_on_commit=False)
+    asyncio.run(async_engine.dispose())
+
+
+def make_settlement(miner_hotkey="hotkey"):
+    return SettlementCreate(
+        miner_hotkey=miner_hotkey,
+        pair="BTC/USDT",
+        exchange_from="binance",
+        exchange_to="okx",
+        price_from=100.0,
+        price_to=101.0,
+        fees_from=0.001,
+        fees_to=0.001,
+        amount=100.0,
+        due_at=time.time(),
+    )
+
+
+def test_async_crud_round_trip(session_factory):
+    async def run():
+        async with session_factory() as db:
+            created = await crud.async_settlement.create(db, obj_in=make_settlement())
+            assert created.id is not None
+
+            updated = await crud.async_settlement.update(db, db_obj=created, obj_in={"amount": 50.0})
+            assert (await crud.async_settlement.get(db, updated.id)).amount == 50.0
+
+            await crud.async_settlement.remove(db, id=created.id)
+            assert await crud.async_settlement.get_multi(db) == []
+
+    asyncio.run(run())
+
+
+def test_concurrent_async_writes(session_factory):
+    async def create(i):
+        async with session_factory() as db:
+            return (await crud.async_settlement.create(db, obj_in=make_settlement(f"hotkey{i}"))).id
+
+    async def run():
+        ids = await asyncio.gather(*[create(i) for i in range(100)])
+        async with session_factory() as db:
+            return ids, await crud.async_settlement.get_multi(db)
+
+    ids, rows = asyncio.run(run())
+
+    assert len(set(ids)) == 100
+    assert len(rows) == 100
+
+
+def test_async_rollup_statements(session_factory):
+    now = int(time.time())
+
+    async def run():
+        async with session_factory() as db:
+            db.add_all(
+                [
+                    models.Miner(
+                        miner_hotkey="active",
+                        last_amount=9000,
+                        transaction_count=2,
+                        last_updated=now,
+                        day_profit=3.0,
+                    ),
+                    models.Miner(
+                        miner_hotkey="idle",
+                        last_amount=9000,
+                        transaction_count=0,
+                        last_updated=now - 8 * 86400,
+                    ),
+                ]
+            )
+            await db.commit()
+
+            removed = await crud.async_miner.remove_inactive(db, before=now - 7 * 86400)
+            days = await crud.async_day.create_daily_totals(db, timestamp=now)
+            reset = await crud.async_miner.reset_balances(db, last_amount=10000)
+            await db.commit()
+
+            miner = await crud.async_miner.get_miner(db, miner_hotkey="active")
+            return removed, days, reset, miner, await crud.async_day.get_days(db, miner_hotkey="active")
+
+    removed, days, reset, miner, rows = asyncio.run(run())
+
+    assert removed == ["idle"]
+    assert days == reset == 1
+    assert (miner.last_amount, miner.transaction_count, miner.day_profit) == (10000, 0, 0)
+    assert [(row.total_profit, row.timestamp) for row in rows] == [(3.0, now)]
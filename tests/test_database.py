@@ -0,0 +1,51 @@
+import types
+
+from sqlalchemy import text
+
+import template.validator.database as database
+from template.validator.database import create_db_engine, init_db
+
+
+def pragma(engine, name):
+    with engine.connect() as connection:
+        return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_engine_tunes_every_connection(tmp_path):
+    engine = create_db_engine(
+        str(tmp_path / "validator.db"), busy_timeout=1234, cache_size=2048, mmap_size=1 << 20
+    )
+
+    assert not engine.echo
+    assert pragma(engine, "journal_mode") == "wal"
+    # NORMAL
+    assert pragma(engine, "synchronous") == 1
+    assert pragma(engine, "busy_timeout") == 1234
+    assert pragma(engine, "cache_size") == -2048
+    assert pragma(engine, "mmap_size") == 1 << 20
+    engine.dispose()
+
+
+def test_init_db_rebinds_the_session_factory(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "engine", database.engine)
+    bind = database.SessionLocal.kw["bind"]
+    config = types.SimpleNamespace(
+        neuron=types.SimpleNamespace(
+            database_path=str(tmp_path / "configured.db"),
+            database_echo=False,
+            database_busy_timeout=5000,
+            database_cache_size=1024,
+            database_mmap_size=0,
+        )
+    )
+
+    try:
+        engine = init_db(config)
+        with database.session_scope() as db:
+            db.execute(text("CREATE TABLE t (x INTEGER)"))
+
+        assert database.engine is engine
+        assert (tmp_path / "configured.db").exists()
+        engine.dispose()
+    finally:
+        database.SessionLocal.configure(bind=bind)
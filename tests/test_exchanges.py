@@ -0,0 +1,144 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import ccxt
+import pytest
+
+from template.validator.exchanges import ExchangeRegistry
+from template.validator.fees import DEFAULT_FEE, FeeTable
+
+
+class FakeExchange:
+    instances = 0
+
+    def __init__(self, config=None):
+        FakeExchange.instances += 1
+        self.loads = 0
+        self.markets = None
+
+    def load_markets(self, reload=False):
+        self.loads += 1
+        self.markets = {"BTC/USDT": {"maker": 0.001}}
+        return self.markets
+
+
+class BrokenExchange(FakeExchange):
+    def load_markets(self, reload=False):
+        raise ccxt.NetworkError("offline")
+
+
+@pytest.fixture
+def fake_exchanges(monkeypatch):
+    FakeExchange.instances = 0
+    monkeypatch.setattr(ccxt, "fakeex", FakeExchange, raising=False)
+    monkeypatch.setattr(ccxt, "brokenex", BrokenExchange, raising=False)
+    monkeypatch.setattr(ccxt, "exchanges", ccxt.exchanges + ["fakeex", "brokenex"])
+
+
+def test_registry_reuses_warm_instance(fake_exchanges):
+    registry = ExchangeRegistry()
+
+    first = registry.get("fakeex")
+    second = registry.get("fakeex")
+
+    assert first is second
+    assert first.loads == 1
+    assert registry.stats()["hits"] == 1
+    assert registry.stats()["misses"] == 1
+    assert "fakeex" in registry.stats()["refresh_durations"]
+
+
+def test_registry_creates_each_exchange_once_under_concurrency(fake_exchanges):
+    registry = ExchangeRegistry()
+    barrier = threading.Barrier(16)
+
+    def get(_):
+        barrier.wait()
+        return registry.get("fakeex")
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(get, range(16)))
+
+    assert FakeExchange.instances == 1
+    assert all(result is results[0] for result in results)
+    assert registry.hits + registry.misses == 16
+
+
+def test_registry_rejects_unknown_exchange(fake_exchanges):
+    registry = ExchangeRegistry()
+
+    with pytest.raises(ValueError):
+        registry.get("__class__")
+
+
+def test_registry_does_not_pool_failed_exchange(fake_exchanges):
+    registry = ExchangeRegistry()
+
+    with pytest.raises(ccxt.NetworkError):
+        registry.get("brokenex")
+
+    assert registry.stats()["exchanges"] == 0
+
+
+def test_registry_refresh_reloads_markets(fake_exchanges):
+    registry = ExchangeRegistry()
+    exchange = registry.get("fakeex")
+
+    registry.refresh()
+
+    assert exchange.loads == 2
+    assert registry.last_refresh is not None
+
+
+class FakeFeeExchange:
+    def __init__(self, has_fees=True):
+        self.has = {"fetchTradingFees": has_fees}
+        self.markets = {"ETH/USDT": {"maker": 0.0015}}
+        self.fee_calls = 0
+        self.fail = False
+
+    def fetch_trading_fees(self):
+        self.fee_calls += 1
+        if self.fail:
+            raise ccxt.NetworkError("offline")
+        return {"BTC/USDT": {"maker": 0.001, "taker": 0.002}}
+
+
+class FakeRegistry:
+    def __init__(self, exchanges):
+        self.exchanges = exchanges
+
+    def get(self, exchange_id):
+        return self.exchanges[exchange_id]
+
+
+def test_fee_table_loads_each_exchange_once():
+    exchange = FakeFeeExchange()
+    fees = FeeTable(FakeRegistry({"fakeex": exchange}))
+
+    assert fees.get("fakeex", "BTC/USDT") == 0.001
+    assert fees.get("fakeex", "BTC/USDT") == 0.001
+    # Symbols missing from the endpoint use the market's static fee.
+    assert fees.get("fakeex", "ETH/USDT") == 0.0015
+    assert fees.get("fakeex", "DOGE/USDT") == DEFAULT_FEE
+    assert exchange.fee_calls == 1
+
+
+def test_fee_table_defaults_without_fee_endpoint():
+    exchange = FakeFeeExchange(has_fees=False)
+    fees = FeeTable(FakeRegistry({"fakeex": exchange}))
+
+    assert fees.get("fakeex", "BTC/USDT") == DEFAULT_FEE
+    assert exchange.fee_calls == 0
+
+
+def test_fee_table_keeps_stale_table_when_refresh_fails():
+    exchange = FakeFeeExchange()
+    fees = FeeTable(FakeRegistry({"fakeex": exchange}), refresh_interval=0)
+
+    assert fees.get("fakeex", "BTC/USDT") == 0.001
+    exchange.fail = True
+    assert fees.get("fakeex", "BTC/USDT") == 0.001
+    # The failed refresh backs off instead of calling the endpoint on every request.
+    assert fees.get("fakeex", "BTC/USDT") == 0.001
+    assert exchange.fee_calls == 2
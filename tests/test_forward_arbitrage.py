@@ -0,0 +1,190 @@
+import asyncio
+import random
+import threading
+import time
+import types
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+import template.validator.database as database
+from template.validator import crud
+from neurons.validator import Validator
+from template.protocol import ArbitrageData
+from template.utils.misc import KeyedLock
+from template.validator.db.models import Arbitrage, Base, Settlement
+from template.validator.ledger import MinerLedger
+
+
+class RecordingScheduler:
+    def __init__(self):
+        self.scheduled = []
+        self.lock = threading.Lock()
+
+    def schedule(self, settlement):
+        with self.lock:
+            self.scheduled.append(settlement)
+
+
+@pytest.fixture
+def validator(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'validator.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", session_factory)
+    monkeypatch.setattr(
+        database,
+        "AsyncSessionLocal",
+        async_sessionmaker(database.create_async_db_engine(str(tmp_path / "validator.db"))),
+    )
+
+    neuron = object.__new__(Validator)
+    neuron.config = types.SimpleNamespace(
+        neuron=types.SimpleNamespace(settlement_delay=300)
+    )
+    neuron.ledger = MinerLedger(session_factory)
+    neuron.miner_locks = KeyedLock()
+    neuron.settlements = RecordingScheduler()
+
+    async def fetch_leg(exchange_id, symbol):
+        # Yield to the other synapses so their balance updates interleave.
+        await asyncio.sleep(random.random() / 100)
+        price = 100.0 if exchange_id == "binance" else 101.0
+        return {"price": price, "fees": 0.001}
+
+    neuron.fetch_leg = fetch_leg
+    yield neuron
+    engine.dispose()
+
+
+def make_synapse(miner_hotkey, amount):
+    synapse = ArbitrageData(
+        pair="BTC/USDT", exchange1="binance", exchange2="okx", amount=amount
+    )
+    synapse.dendrite.hotkey = miner_hotkey
+    return synapse
+
+
+def test_forward_arbitrage_rejects_invalid_amount(validator):
+    synapse = asyncio.run(validator.forward_arbitrage(make_synapse("hotkey", 1.5)))
+
+    assert synapse.status_code == 404
+    assert "hotkey" not in validator.ledger
+
+
+def test_concurrent_synapses_for_one_hotkey_do_not_lose_updates(validator):
+    fraction, fees, synapses = 0.01, 0.001, 300
+
+    async def run():
+        return await asyncio.gather(
+            *[
+                validator.forward_arbitrage(make_synapse("hotkey", fraction))
+                for _ in range(synapses)
+            ]
+        )
+
+    responses = asyncio.run(run())
+
+    assert all(response.status_code == 200 for response in responses)
+    scheduled = validator.settlements.scheduled
+    assert len(scheduled) == synapses
+
+    # Every debit saw the balance left by the previous one.
+    last_amount = validator.ledger.get("hotkey")[0]
+    assert last_amount == pytest.approx(10000 * (1 - fraction * (1 + fees)) ** synapses)
+    spent = sum(settlement.amount * (1 + fees) for settlement in scheduled)
+    assert last_amount + spent == pytest.approx(10000)
+    assert len(validator.miner_locks) == 0
+
+
+def test_concurrent_debits_and_settlements_balance(validator):
+    fraction, fees, synapses = 0.01, 0.001, 200
+
+    async def run():
+        return await asyncio.gather(
+            *[
+                validator.forward_arbitrage(make_synapse("hotkey", fraction))
+                for _ in range(synapses)
+            ]
+        )
+
+    # Settle sell legs from another thread while the buys are still coming in.
+    stop = threading.Event()
+    credited = []
+
+    def settle():
+        while not stop.is_set() or len(credited) < synapses:
+            with validator.settlements.lock:
+                pending = validator.settlements.scheduled[len(credited) :]
+            for settlement in pending:
+                validator.ledger.credit(settlement.miner_hotkey, settlement.proceeds)
+                credited.append(settlement)
+            if not pending:
+                time.sleep(0.001)
+
+    settler = threading.Thread(target=settle)
+    settler.start()
+    asyncio.run(run())
+    stop.set()
+    settler.join(10)
+
+    spent = sum(settlement.amount * (1 + fees) for settlement in credited)
+    proceeds = sum(settlement.proceeds for settlement in credited)
+    last_amount, transaction_count, _ = validator.ledger.get("hotkey")
+    assert transaction_count == synapses
+    assert last_amount == pytest.approx(10000 - spent + proceeds)
+
+
+def test_different_hotkeys_do_not_share_balances(validator):
+    async def run():
+        return await asyncio.gather(
+            *[
+                validator.forward_arbitrage(make_synapse(f"hotkey{i % 10}", 0.1))
+                for i in range(100)
+            ]
+        )
+
+    asyncio.run(run())
+
+    for i in range(10):
+        last_amount = validator.ledger.get(f"hotkey{i}")[0]
+        assert last_amount == pytest.approx(10000 * (1 - 0.1 * 1.001) ** 10)
+
+
+def test_settlements_use_their_own_sessions(validator):
+    asyncio.run(validator.forward_arbitrage(make_synapse("hotkey", 0.1)))
+    scheduled = validator.settlements.scheduled
+    assert scheduled[0].id is not None
+
+    # Settle from a worker thread while the request path keeps persisting new sell legs.
+    settler = threading.Thread(target=validator.run_transaction, args=(scheduled[:],))
+    settler.start()
+    asyncio.run(validator.forward_arbitrage(make_synapse("hotkey", 0.1)))
+    settler.join(10)
+
+    with database.SessionLocal() as db:
+        assert db.query(Arbitrage).count() == 1
+        assert [row.id for row in db.query(Settlement).all()] == [scheduled[1].id]
+
+
+def test_settled_trades_accumulate_the_day_profit(validator):
+    async def run():
+        return await asyncio.gather(
+            *[validator.forward_arbitrage(make_synapse(f"hotkey{i % 3}", 0.1)) for i in range(12)]
+        )
+
+    asyncio.run(run())
+    validator.run_transaction(validator.settlements.scheduled)
+    validator.ledger.flush()
+
+    with database.SessionLocal() as db:
+        audit = crud.arbitrage.get_recent_profits(db)
+        assert crud.arbitrage.get_profit_sum(db, miner_hotkey="hotkey0", limit=4) == pytest.approx(
+            audit["hotkey0"]
+        )
+
+    assert sorted(audit) == ["hotkey0", "hotkey1", "hotkey2"]
+    for miner_hotkey, profit in audit.items():
+        assert validator.ledger.day_profit(miner_hotkey) == pytest.approx(profit)
@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from template.validator.jobs import RETRY_INTERVAL, JobScheduler
+
+DAY = 86400
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+class Counter:
+    def __init__(self, fail=0):
+        self.calls = 0
+        self.fail = fail
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.fail:
+            raise RuntimeError("database is locked")
+
+
+def test_job_slots_align_to_utc_midnight():
+    scheduler = JobScheduler()
+    daily = scheduler.add("daily", Counter())
+    quarterly = scheduler.add("quarterly", Counter(), interval=6 * 3600, offset=1800)
+
+    now = utc(2024, 9, 16, 13, 5)
+    assert daily.slot(now) == utc(2024, 9, 16)
+    assert quarterly.slot(now) == utc(2024, 9, 16, 12, 30)
+    assert quarterly.slot(utc(2024, 9, 16, 0, 10)) == utc(2024, 9, 15, 18, 30)
+
+
+def test_job_waits_for_its_first_slot():
+    scheduler = JobScheduler()
+    job = Counter()
+    scheduler.add("daily", job)
+
+    assert asyncio.run(scheduler.run_pending()) == []
+    assert job.calls == 0
+
+
+def test_missed_runs_are_caught_up_once(tmp_path):
+    state_path = str(tmp_path / "jobs.json")
+    scheduler = JobScheduler(state_path)
+    scheduler.add("daily", Counter())
+    scheduler.jobs["daily"].last_run = utc(2024, 9, 10)
+    scheduler._save_state()
+
+    # The validator was down for four days.
+    restarted = JobScheduler(state_path)
+    job = Counter()
+    restarted.add("daily", job)
+    now = utc(2024, 9, 14, 8)
+
+    assert asyncio.run(restarted.run_pending(now)) == ["daily"]
+    assert asyncio.run(restarted.run_pending(now + 3600)) == []
+    assert asyncio.run(restarted.run_pending(utc(2024, 9, 15))) == ["daily"]
+    assert job.calls == 2
+    assert JobScheduler(state_path)._state["daily"] == utc(2024, 9, 15)
+
+
+def test_failed_run_is_retried():
+    scheduler = JobScheduler()
+    job = Counter(fail=1)
+    scheduler.add("daily", job).last_run = utc(2024, 9, 15)
+    now = utc(2024, 9, 16, 0, 0, 1)
+
+    assert asyncio.run(scheduler.run_pending(now)) == []
+    assert asyncio.run(scheduler.run_pending(now + 1)) == []
+    assert asyncio.run(scheduler.run_pending(now + RETRY_INTERVAL)) == ["daily"]
+    assert job.calls == 2
+
+
+def test_invalid_interval():
+    with pytest.raises(ValueError):
+        JobScheduler().add("never", Counter(), interval=0)
@@ -0,0 +1,114 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import template.validator.db.models as models
+from template.validator.db.models import Base
+from template.validator.ledger import MinerLedger
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ledger.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def count(session_factory, model):
+    with session_factory() as db:
+        return db.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_ledger_debit_and_credit(session_factory):
+    ledger = MinerLedger(session_factory)
+
+    assert ledger.create("hotkey", 10000)
+    assert not ledger.create("hotkey", 10000)
+
+    last_amount, amount_for_buying = ledger.debit("hotkey", 0.5, 0.01)
+    assert last_amount == 10000
+    assert amount_for_buying == 5000
+    assert ledger.get("hotkey")[0] == pytest.approx(10000 - 5000 * 1.01)
+
+    assert ledger.credit("hotkey", 5100)
+    assert ledger.get("hotkey")[:2] == (pytest.approx(10000 - 5050 + 5100), 1)
+
+    assert ledger.debit("unknown", 0.5, 0.01) is None
+    assert not ledger.credit("unknown", 1)
+
+
+def test_ledger_accumulates_day_profit(session_factory):
+    ledger = MinerLedger(session_factory)
+    ledger.create("hotkey", 10000)
+
+    ledger.credit("hotkey", 1010, profit=10)
+    ledger.credit("hotkey", 995, profit=-5)
+    ledger.credit("hotkey", 100, transactions=0)
+    assert ledger.day_profit("hotkey") == pytest.approx(5)
+    assert ledger.day_profit("unknown") is None
+
+    ledger.flush()
+    reloaded = MinerLedger(session_factory)
+    reloaded.load()
+    assert reloaded.day_profit("hotkey") == pytest.approx(5)
+
+    reloaded.reset("hotkey", 10000)
+    assert reloaded.day_profit("hotkey") == 0
+
+
+def test_ledger_refuses_empty_balance(session_factory):
+    ledger = MinerLedger(session_factory)
+    ledger.create("hotkey", 0)
+
+    assert ledger.debit("hotkey", 0.5, 0.01) is None
+
+
+def test_ledger_flush_and_load_round_trip(session_factory):
+    ledger = MinerLedger(session_factory)
+    ledger.create("a", 10000)
+    ledger.create("b", 10000)
+    ledger.flush()
+    ledger.debit("a", 0.1, 0.0)
+    ledger.credit("b", 50)
+    ledger.flush()
+
+    reloaded = MinerLedger(session_factory)
+    reloaded.load()
+
+    assert count(session_factory, models.Miner) == 2
+    assert reloaded.get("a")[:2] == (pytest.approx(9000), 0)
+    assert reloaded.get("b")[:2] == (pytest.approx(10050), 1)
+
+
+def test_ledger_remove_deletes_miner_and_history(session_factory):
+    ledger = MinerLedger(session_factory)
+    ledger.create("a", 10000)
+    ledger.flush()
+    with session_factory() as db:
+        db.add(models.Day(miner_hotkey="a", total_profit=1.0, timestamp=1704067200))
+        db.commit()
+
+    ledger.remove("a")
+    ledger.flush()
+
+    assert "a" not in ledger
+    assert count(session_factory, models.Miner) == 0
+    assert count(session_factory, models.Day) == 0
+
+
+def test_ledger_keeps_changes_when_flush_fails(session_factory):
+    ledger = MinerLedger(session_factory)
+    ledger.create("a", 10000)
+
+    def broken_session():
+        raise RuntimeError("database is locked")
+
+    ledger.session_factory = broken_session
+    with pytest.raises(RuntimeError):
+        ledger.flush()
+
+    ledger.session_factory = session_factory
+    ledger.flush()
+
+    assert count(session_factory, models.Miner) == 1
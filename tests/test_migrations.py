@@ -0,0 +1,70 @@
+import shutil
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from template.validator.db.migrations import SCHEMA_VERSION, migrate
+
+EXAMPLE_DB = Path(__file__).resolve().parents[1] / "example.db"
+
+
+def rows(path, query):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(query).fetchall()
+
+
+def test_migrate_creates_a_new_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+
+    assert migrate(engine) == 0
+    assert rows(tmp_path / "new.db", "PRAGMA user_version") == [(SCHEMA_VERSION,)]
+    assert {"miner", "arbitrage", "day", "settlement"} <= set(inspect(engine).get_table_names())
+    engine.dispose()
+
+
+def test_migrate_converts_string_timestamps_in_place(tmp_path):
+    path = tmp_path / "example.db"
+    shutil.copy(EXAMPLE_DB, path)
+    before = rows(path, "SELECT id, miner_hotkey, amount, timestamp FROM arbitrage ORDER BY id")
+    days = rows(path, "SELECT COUNT(*) FROM day")
+
+    engine = create_engine(f"sqlite:///{path}")
+    assert migrate(engine) == 0
+    # Already current, nothing to do.
+    assert migrate(engine) == SCHEMA_VERSION
+    engine.dispose()
+
+    after = rows(path, "SELECT id, miner_hotkey, amount, timestamp FROM arbitrage ORDER BY id")
+    assert len(after) == len(before)
+    for (id, miner_hotkey, amount, old), row in zip(before, after):
+        expected = int(datetime.strptime(old, "%Y-%m-%d %H:%M:%S").timestamp())
+        assert row == (id, miner_hotkey, amount, expected)
+
+    assert rows(path, "SELECT COUNT(*) FROM day") == days
+    assert rows(path, "SELECT DISTINCT typeof(timestamp) FROM day") == [("integer",)]
+    assert rows(path, "SELECT DISTINCT typeof(last_updated) FROM miner") == [("integer",)]
+
+    # The running day profit starts from the trades since each miner's last day row.
+    miners = rows(path, "SELECT miner_hotkey, transaction_count, day_profit FROM miner")
+    for miner_hotkey, transaction_count, day_profit in miners:
+        if transaction_count == 0:
+            assert day_profit == 0
+            continue
+        last_day = rows(path, f"SELECT MAX(timestamp) FROM day WHERE miner_hotkey = '{miner_hotkey}'")[0][0]
+        since = rows(
+            path,
+            "SELECT SUM(amount * profit) FROM arbitrage "
+            f"WHERE miner_hotkey = '{miner_hotkey}' AND timestamp > {last_day or 0}",
+        )[0][0]
+        assert day_profit == pytest.approx(since or 0)
+
+    # The foreign keys still reference the miner table.
+    assert rows(path, "PRAGMA foreign_key_list(arbitrage)")[0][2] == "miner"
+    plan = rows(
+        path,
+        "EXPLAIN QUERY PLAN SELECT timestamp FROM day WHERE miner_hotkey = 'a' ORDER BY timestamp DESC LIMIT 7",
+    )
+    assert "ix_day_miner_hotkey_timestamp" in plan[0][-1]
@@ -0,0 +1,91 @@
+import asyncio
+import random
+import time
+import types
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+import template.validator.database as database
+import template.validator.db.models as models
+from neurons.validator import Validator
+from template.validator.db.models import Base
+from template.validator.ledger import MinerLedger
+from template.validator.reward import weighted_profits
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reward.db'}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+    engine.dispose()
+
+
+def loop_weighted_average(profits):
+    # The per-miner loop the vectorized version replaces, profits newest first.
+    n = len(profits)
+    weighted_sum = sum(profit * (n - i) for i, profit in enumerate(profits))
+    total_weight = sum(n - i for i in range(n))
+    return weighted_sum / total_weight
+
+
+def test_weighted_profits_matches_the_per_miner_loop(db):
+    random.seed(0)
+    now = int(time.time())
+    history = {}
+    for m in range(300):
+        miner_hotkey = f"hotkey{m}"
+        history[miner_hotkey] = [random.uniform(-100, 100) for _ in range(m % 12)]
+        db.add_all(
+            models.Day(miner_hotkey=miner_hotkey, total_profit=profit, timestamp=now - day * 86400)
+            for day, profit in enumerate(history[miner_hotkey])
+        )
+    db.commit()
+
+    miner_hotkeys = list(history) + ["unknown"]
+    averages, has_history = weighted_profits(db, miner_hotkeys)
+
+    for i, miner_hotkey in enumerate(miner_hotkeys):
+        profits = history.get(miner_hotkey, [])[:7]
+        assert has_history[i] == bool(profits)
+        expected = loop_weighted_average(profits) if profits else 0
+        assert averages[i] == pytest.approx(expected)
+
+
+def test_weighted_profits_without_miners(db):
+    averages, has_history = weighted_profits(db, [])
+
+    assert averages.shape == has_history.shape == (0,)
+
+
+def test_reward_distribution_aligns_uids_and_profits(db, tmp_path, monkeypatch):
+    session_factory = sessionmaker(bind=db.get_bind())
+    monkeypatch.setattr(
+        database,
+        "AsyncSessionLocal",
+        async_sessionmaker(database.create_async_db_engine(str(tmp_path / "reward.db"))),
+    )
+
+    now = int(time.time())
+    # "gone" is deregistered and "idle" has no history, neither may shift the others.
+    for miner_hotkey, profit in (("gone", 500.0), ("a", 10.0), ("b", 20.0)):
+        db.add(models.Day(miner_hotkey=miner_hotkey, total_profit=profit, timestamp=now))
+    db.commit()
+
+    neuron = object.__new__(Validator)
+    neuron.config = types.SimpleNamespace(neuron=types.SimpleNamespace(moving_average_alpha=1.0))
+    neuron.ledger = MinerLedger(session_factory)
+    for miner_hotkey in ("gone", "idle", "a", "b"):
+        neuron.ledger.create(miner_hotkey, 10000)
+    neuron.hotkeys = ["validator", "b", "idle", "a"]
+    neuron.index_hotkeys()
+    neuron.scores = np.zeros(len(neuron.hotkeys))
+
+    asyncio.run(neuron.reward_distribution())
+
+    assert neuron.scores.tolist() == [0.0, 20.0, 0.0, 10.0]
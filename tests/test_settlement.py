@@ -0,0 +1,109 @@
+import time
+import threading
+
+import pytest
+
+from template.validator.settlement import PendingSettlement, SettlementScheduler
+
+
+def make_settlement(miner_hotkey="hotkey", due_at=0.0, amount=100.0):
+    return PendingSettlement(
+        miner_hotkey=miner_hotkey,
+        pair="BTC/USDT",
+        exchange_from="binance",
+        exchange_to="okx",
+        price_from=100.0,
+        price_to=102.0,
+        fees_from=0.001,
+        fees_to=0.001,
+        amount=amount,
+        due_at=due_at,
+    )
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def test_settlement_profit_and_proceeds():
+    settlement = make_settlement()
+
+    assert settlement.profit == pytest.approx(0.999 * 1.02 * 0.999 - 1)
+    assert settlement.proceeds == pytest.approx(100 * 0.999 * 1.02 * 0.999)
+
+
+def test_scheduler_settles_thousands_with_fixed_workers():
+    settled = []
+    lock = threading.Lock()
+    threads_before = threading.active_count()
+
+    def settle(batch):
+        with lock:
+            settled.extend(batch)
+
+    scheduler = SettlementScheduler(settle, workers=2)
+    scheduler.start()
+    now = time.time()
+    for i in range(5000):
+        scheduler.schedule(make_settlement(f"hotkey{i}", due_at=now + 0.2))
+
+    # Scheduling never blocks and only the timer and worker threads exist.
+    assert len(scheduler) > 0
+    assert threading.active_count() <= threads_before + 3
+
+    wait_for(lambda: scheduler.settled == 5000)
+    scheduler.stop()
+
+    assert len(settled) == 5000
+    assert scheduler.failed == 0
+
+
+def test_scheduler_wakes_for_earlier_settlement():
+    settled = []
+    scheduler = SettlementScheduler(settled.extend, workers=1)
+    scheduler.start()
+    now = time.time()
+
+    scheduler.schedule(make_settlement("late", due_at=now + 60))
+    scheduler.schedule(make_settlement("early", due_at=now + 0.05))
+
+    wait_for(lambda: len(settled) == 1)
+    scheduler.stop()
+
+    assert settled[0].miner_hotkey == "early"
+    assert len(scheduler) == 1
+
+
+def test_scheduler_counts_failed_settlements():
+    def settle(batch):
+        raise RuntimeError("database is locked")
+
+    scheduler = SettlementScheduler(settle, workers=1)
+    scheduler.start()
+    scheduler.schedule(make_settlement(due_at=time.time()))
+
+    wait_for(lambda: scheduler.failed == 1)
+    scheduler.stop()
+
+
+def test_scheduler_replays_loaded_settlements_in_due_order():
+    batches = []
+    now = time.time()
+    pending = [
+        make_settlement(f"hotkey{i}", due_at=now - 100 + (i * 7919) % 1000 / 100)
+        for i in range(20000)
+    ]
+
+    scheduler = SettlementScheduler(batches.append, workers=1, batch_size=500)
+    scheduler.load(pending)
+    scheduler.start()
+    wait_for(lambda: scheduler.settled == 20000)
+    scheduler.stop()
+
+    settled = [settlement for batch in batches for settlement in batch]
+    assert len(batches) == 40
+    assert [s.due_at for s in settled] == sorted(s.due_at for s in pending)
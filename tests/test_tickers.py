@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from template.validator.tickers import TickerCache
+
+
+def test_ticker_cache_coalesces_concurrent_misses():
+    cache = TickerCache(max_age=10)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"last": 100.0}
+
+    async def run():
+        return await asyncio.gather(
+            *[cache.get("binance", "BTC/USDT", fetch) for _ in range(50)]
+        )
+
+    tickers = asyncio.run(run())
+
+    assert calls == 1
+    assert all(ticker == {"last": 100.0} for ticker in tickers)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 49
+
+
+def test_ticker_cache_serves_fresh_entry_and_refetches_stale():
+    cache = TickerCache(max_age=0.05)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return {"last": float(calls)}
+
+    async def run():
+        first = await cache.get("binance", "BTC/USDT", fetch)
+        second = await cache.get("binance", "BTC/USDT", fetch)
+        await asyncio.sleep(0.1)
+        third = await cache.get("binance", "BTC/USDT", fetch)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert first == second == {"last": 1.0}
+    assert third == {"last": 2.0}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_ticker_cache_does_not_cache_failures():
+    cache = TickerCache(max_age=10)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("exchange down")
+        return {"last": 1.0}
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await cache.get("binance", "BTC/USDT", fetch)
+        return await cache.get("binance", "BTC/USDT", fetch)
+
+    assert asyncio.run(run()) == {"last": 1.0}
+    assert calls == 2
+
+
+def test_ticker_cache_fetch_survives_waiter_timeout():
+    cache = TickerCache(max_age=10)
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return {"last": 1.0}
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.get("okx", "ETH/USDT", fetch), 0.01)
+        return await cache.get("okx", "ETH/USDT", fetch)
+
+    assert asyncio.run(run()) == {"last": 1.0}
+    assert cache.stats()["misses"] == 1
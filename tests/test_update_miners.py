@@ -0,0 +1,115 @@
+import asyncio
+import time
+import types
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+import template.validator.database as database
+import template.validator.db.models as models
+from neurons.validator import Validator
+from template.validator.db.models import Base
+from template.validator.ledger import MinerLedger
+
+
+@pytest.fixture
+def validator(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'validator.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", session_factory)
+    monkeypatch.setattr(
+        database,
+        "AsyncSessionLocal",
+        async_sessionmaker(database.create_async_db_engine(str(tmp_path / "validator.db"))),
+    )
+
+    neuron = object.__new__(Validator)
+    neuron.ledger = MinerLedger(session_factory)
+    yield neuron
+    engine.dispose()
+
+
+def trade(miner_hotkey, amount, profit, timestamp):
+    return models.Arbitrage(
+        miner_hotkey=miner_hotkey,
+        pair="BTC/USDT",
+        exchange_from="binance",
+        exchange_to="okx",
+        price_from=100.0,
+        price_to=101.0,
+        fees_from=0.001,
+        fees_to=0.001,
+        amount=amount,
+        timestamp=timestamp,
+        profit=profit,
+    )
+
+
+def test_update_miners_rolls_up_thousands_of_miners(validator):
+    now = int(time.time())
+    yesterday = now - 86400
+    miners, trades = 3000, 10
+    expected_total = sum(100 * 0.01 * t for t in range(trades))
+
+    with database.SessionLocal() as db:
+        for m in range(miners):
+            miner_hotkey = f"hotkey{m}"
+            db.add(
+                models.Miner(
+                    miner_hotkey=miner_hotkey,
+                    last_amount=9000,
+                    # Every third miner did not trade today, every hundredth went inactive.
+                    transaction_count=0 if m % 3 == 0 else trades,
+                    day_profit=0 if m % 3 == 0 else expected_total,
+                    last_updated=now - 8 * 86400 if m % 100 == 0 else now,
+                )
+            )
+            # Already rolled up yesterday.
+            db.add(trade(miner_hotkey, 1000, 1.0, yesterday - 10))
+            db.add(models.Day(miner_hotkey=miner_hotkey, total_profit=1000, timestamp=yesterday))
+            if m % 3:
+                db.add_all(trade(miner_hotkey, 100, 0.01 * t, now - t) for t in range(trades))
+        db.commit()
+    validator.ledger.load()
+
+    start = time.perf_counter()
+    asyncio.run(validator.update_miners())
+    assert time.perf_counter() - start < 1
+
+    with database.SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(models.Miner)) == miners - miners // 100
+        assert db.scalar(select(func.count()).where(models.Arbitrage.miner_hotkey == "hotkey0")) == 0
+
+        days = dict(
+            db.execute(
+                select(models.Day.miner_hotkey, models.Day.total_profit).where(
+                    models.Day.timestamp > yesterday
+                )
+            ).all()
+        )
+        assert len(days) == len([m for m in range(miners) if m % 3 and m % 100])
+        assert days["hotkey1"] == pytest.approx(expected_total)
+        assert "hotkey3" not in days
+
+    assert validator.ledger.get("hotkey1")[:2] == (10000, 0)
+    assert validator.ledger.get("hotkey3")[:2] == (9000, 0)
+    assert "hotkey0" not in validator.ledger
+
+
+def test_update_miners_keeps_unflushed_trades(validator):
+    now = int(time.time())
+    validator.ledger.create("hotkey", 10000)
+    validator.ledger.debit("hotkey", 0.1, 0.0)
+    with database.SessionLocal() as db:
+        db.add(trade("hotkey", 1000, 0.02, now - 5))
+        db.commit()
+    validator.ledger.credit("hotkey", 1020, profit=1000 * 0.02)
+
+    asyncio.run(validator.update_miners())
+
+    with database.SessionLocal() as db:
+        assert db.scalar(select(models.Day.total_profit)) == pytest.approx(20)
+    assert validator.ledger.get("hotkey")[:2] == (10000, 0)